@@ -0,0 +1,185 @@
+# asgi.py
+"""ASGI version of the Niblit HTTP service (server.py + niblit_web routes).
+
+The event loop only parses requests and writes responses; every blocking
+core call (chat handling, LLM requests, database reads and writes) runs on
+a BoundedExecutor, so slow replies never stall other clients and overload
+answers 503 instead of queueing without limit. The core is built in the
+startup hook and saved in the shutdown hook.
+
+Run in production with:
+
+    python asgi.py                  # NIBLIT_HOST / PORT / NIBLIT_MAX_CONNECTIONS
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Keep one worker process: the core holds in-process state.
+"""
+import os
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+import uvicorn
+
+from modules.worker_pool import BoundedExecutor, Overloaded
+from modules.memory_query import parse_query, etag, not_modified, iter_ndjson
+from dashboard_page import DASHBOARD_HTML
+
+app = FastAPI(title="Niblit", version="1.0")
+pool = BoundedExecutor(name="niblit-asgi")
+n = None  # NiblitCore, created on startup
+started = time.time()
+
+def _busy():
+    return JSONResponse({"error": "busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+
+def _starting():
+    return JSONResponse({"error": "starting, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+
+async def _json(request):
+    try:
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+@app.on_event("startup")
+async def _startup():
+    global n
+    from niblit_core import NiblitCore
+    n = await pool.run(NiblitCore)
+
+@app.on_event("shutdown")
+async def _shutdown():
+    if n is not None:
+        try:
+            await pool.run(n.save_all)
+        except Exception:
+            pass
+    pool.shutdown()
+
+@app.get("/", response_class=HTMLResponse)
+async def dashboard():
+    return DASHBOARD_HTML
+
+@app.get("/ping")
+async def ping():
+    if n is None:
+        return {"status": "starting"}
+    try:
+        personality = await pool.run(n.db.get_personality)
+    except Overloaded:
+        return _busy()
+    return {"status": "ok", "personality": personality}
+
+@app.get("/status/stream")
+async def status_stream(request: Request):
+    # server-sent events: full status once, then only changed fields
+    if n is None:
+        return _starting()
+    feed = n.status_feed
+    if feed.version == 0:
+        try:
+            await pool.run(feed.refresh)  # first sample off the event loop
+        except Overloaded:
+            return _busy()
+    since = request.headers.get("last-event-id")
+    return StreamingResponse(feed.sse_async(int(since) if since and since.isdigit() else None),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/chat")
+async def chat(request: Request):
+    data = await _json(request)
+    text = str(data.get("text", "")).strip()
+    if not text:
+        return JSONResponse({"error": "no text provided"}, status_code=400)
+    try:
+        if data.get("stream"):
+            # the generator holds one pool worker for the whole stream
+            return StreamingResponse(pool.stream(n.handle_stream, text), media_type="text/plain")
+        return {"reply": await pool.run(n.handle, text)}
+    except Overloaded:
+        return _busy()
+
+@app.post("/command")
+async def command(request: Request):
+    data = await _json(request)
+    text = str(data.get("text", "")).strip()
+    if not text:
+        return JSONResponse({"error": "No command provided"}, status_code=400)
+    try:
+        response = await pool.run(n.handle, text)
+    except Overloaded:
+        return _busy()
+    except Exception as e:
+        response = f"Error: {str(e)}"
+    return {"response": response}
+
+@app.get("/memory")
+async def memory(request: Request):
+    # ?prefix= &tag= &since= &until= &cursor= &limit= &format=ndjson; 304 while nothing changed
+    try:
+        filters, cursor, limit, stream = parse_query(request.query_params, default_limit=200)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    current = etag(n.db)
+    headers = {"ETag": current, "Cache-Control": "no-cache"}
+    if not_modified(request.headers.get("if-none-match"), current):
+        return Response(status_code=304, headers=headers)
+    if stream:
+        try:
+            return StreamingResponse(pool.stream(iter_ndjson, n.db, filters), media_type="application/x-ndjson",
+                                     headers=headers)
+        except Overloaded:
+            return _busy()
+    try:
+        facts, next_cursor = await pool.run(n.db.query_facts, cursor=cursor, limit=limit, **filters)
+    except Overloaded:
+        return _busy()
+    return JSONResponse({"facts": facts, "next_cursor": next_cursor}, headers=headers)
+
+@app.post("/memory")
+async def remember(request: Request):
+    data = await _json(request)
+    key, value = data.get("key"), data.get("value")
+    if not key or value is None:
+        return JSONResponse({"error": "Provide both key and value"}, status_code=400)
+    try:
+        await pool.run(n.db.add_fact, key, value)
+    except Overloaded:
+        return _busy()
+    return {"message": f"Remembered {key}"}
+
+def _health():
+    return {
+        "status": "alive",
+        "uptime_s": int(time.time() - started),
+        "memory": n.db.counts() if n is not None else {},
+        "llm_enabled": getattr(n, "llm_enabled", False),
+        "workers": pool.stats(),
+        "status_feed": n.status_feed.stats() if n is not None else {},
+    }
+
+@app.get("/health")
+async def health():
+    try:
+        return await pool.run(_health)
+    except Overloaded:
+        return _busy()
+
+@app.get("/status")
+async def status():
+    try:
+        data = await pool.run(_health)
+        data["personality"] = await pool.run(n.db.get_personality)
+    except Overloaded:
+        return _busy()
+    return data
+
+def main():
+    uvicorn.run(app, host=os.environ.get("NIBLIT_HOST", "0.0.0.0"), port=int(os.environ.get("PORT", 5000)),
+                proxy_headers=True, forwarded_allow_ips="*", backlog=2048, timeout_keep_alive=15,
+                limit_concurrency=int(os.environ.get("NIBLIT_MAX_CONNECTIONS", "1000")))
+
+if __name__ == "__main__":
+    main()
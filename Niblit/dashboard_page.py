@@ -0,0 +1,76 @@
+# dashboard_page.py
+# Single-page dashboard shared by the Flask (server.py) and ASGI (asgi.py) apps.
+
+DASHBOARD_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+<title>Niblit Dashboard</title>
+<style>
+body { font-family: Arial, sans-serif; background:#1b1b1b; color:#f1f1f1; }
+.container { width: 90%; max-width: 900px; margin:auto; padding:20px; }
+textarea { width:100%; height:80px; background:#222; color:#f1f1f1; border:none; padding:10px; }
+button { padding:10px 20px; margin-top:10px; background:#444; color:#f1f1f1; border:none; cursor:pointer; }
+#chatbox { border:1px solid #333; padding:10px; height:300px; overflow-y:scroll; background:#111; margin-top:10px;}
+.chat-msg { margin:5px 0; }
+.user { color:#4ef; }
+.bot { color:#fa4; }
+</style>
+</head>
+<body>
+<div class="container">
+<h1>Niblit Dashboard</h1>
+<p>System Status: <span id="status">Initializing...</span></p>
+
+<textarea id="input" placeholder="Type a command or question..."></textarea><br>
+<button onclick="send()">Send</button>
+
+<div id="chatbox"></div>
+
+<script>
+async function send() {
+    let input = document.getElementById("input").value;
+    if(!input) return;
+    let chatbox = document.getElementById("chatbox");
+    chatbox.innerHTML += '<div class="chat-msg user">You: ' + input + '</div>';
+    document.getElementById("input").value = '';
+
+    let resp = await fetch("/chat", {
+        method:"POST",
+        headers:{"Content-Type":"application/json"},
+        body: JSON.stringify({text:input, stream:true})
+    });
+    let bot = document.createElement("div");
+    bot.className = "chat-msg bot";
+    bot.textContent = "Niblit: ";
+    chatbox.appendChild(bot);
+    let reader = resp.body.getReader();
+    let decoder = new TextDecoder();
+    while (true) {
+        let {done, value} = await reader.read();
+        if (done) break;
+        bot.textContent += decoder.decode(value, {stream:true});
+        chatbox.scrollTop = chatbox.scrollHeight;
+    }
+}
+
+// status is pushed by the server (/status/stream) only when it changes;
+// EventSource reconnects by itself and resumes from the last event id
+let current = {};
+function showStatus(changes) {
+    Object.assign(current, changes);
+    let mood = (current.personality && current.personality.mood) || "neutral";
+    document.getElementById("status").innerText = "OK - Personality mood: " + mood;
+}
+if (window.EventSource) {
+    let feed = new EventSource("/status/stream");
+    feed.addEventListener("status", e => showStatus(JSON.parse(e.data)));
+    feed.onerror = () => { document.getElementById("status").innerText = "Reconnecting..."; };
+} else {
+    fetch("/ping").then(r => r.json()).then(showStatus);
+}
+</script>
+</div>
+</body>
+</html>
+"""
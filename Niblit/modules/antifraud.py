@@ -1,5 +1,13 @@
 # modules/antifraud.py
 import re
+from modules.keyword_matcher import KeywordMatcher
+
+SIGNALS = KeywordMatcher({
+    'bank': ['bank'],
+    'password': ['password'],
+    'transfer': ['transfer'],
+    'urgency': ['urgent', 'immediately'],
+})
 
 class AntiFraudModule:
     def __init__(self, db):
@@ -7,13 +15,13 @@ class AntiFraudModule:
 
     def check(self, text):
         # heuristic checks: look for common scam patterns
-        low = text.lower()
+        hits = SIGNALS.scan(text)
         alerts = []
-        if 'bank' in low and 'password' in low:
+        if hits['bank'] and hits['password']:
             alerts.append('Possible credential phishing mention.')
-        if 'transfer' in low and ('urgent' in low or 'immediately' in low):
+        if hits['transfer'] and hits['urgency']:
             alerts.append('Urgent transfer language — common scam pattern.')
-        if re.search(r'\b\d{12,}\b', low):
+        if re.search(r'\b\d{12,}\b', text):
             alerts.append('Long digit sequence detected (possible account/cc).')
         # add ML model hook placeholder
         if not alerts:
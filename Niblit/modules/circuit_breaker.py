@@ -0,0 +1,104 @@
+# modules/circuit_breaker.py
+import threading, time, logging
+
+log = logging.getLogger("circuit-breaker")
+
+class CircuitBreaker:
+    """Availability inferred from real request outcomes.
+
+    closed    -> requests flow; `failure_threshold` consecutive failures open it
+    open      -> is_available() is False; after `reset_timeout` a background
+                 thread moves to half-open and runs `probe`
+    half_open -> probe succeeded: closed; failed: open again with the timeout
+                 doubled (capped at `max_reset_timeout`)
+
+    is_available() only reads a flag, so callers never wait on the network.
+    Any real success closes the breaker immediately. The monitor thread only
+    lives while the breaker is not closed; opening it again starts a new one.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, probe=None, failure_threshold=3, reset_timeout=15.0, max_reset_timeout=300.0, name="llm"):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._state = self.CLOSED
+        self._available = True
+        self._failures = 0
+        self._opened_at = 0.0
+        self._thread = None
+
+    @property
+    def state(self):
+        return self._state
+
+    def is_available(self):
+        return self._available
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != self.CLOSED:
+                log.info("[%s] circuit closed", self.name)
+            self._state = self.CLOSED
+            self._available = True
+            self._reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        if self._state == self.HALF_OPEN:
+            self._reset_timeout = min(self.max_reset_timeout, self._reset_timeout * 2)
+        if self._state != self.OPEN:
+            log.info("[%s] circuit open for %.0fs", self.name, self._reset_timeout)
+        self._state = self.OPEN
+        self._available = False
+        self._opened_at = time.time()
+        self._ensure_monitor()
+        self._wake.set()
+
+    def check_now(self):
+        """Run the probe once in the background (e.g. at startup)."""
+        with self._lock:
+            self._state = self.HALF_OPEN
+            self._ensure_monitor()
+        self._wake.set()
+
+    def _ensure_monitor(self):
+        if self._thread is None and self.probe is not None:
+            self._thread = threading.Thread(target=self._monitor, daemon=True, name=f"{self.name}-breaker")
+            self._thread.start()
+
+    def _monitor(self):
+        while True:
+            with self._lock:
+                state = self._state
+                if state == self.CLOSED:
+                    self._thread = None  # under the lock, so _ensure_monitor starts a fresh one
+                    return
+                wait = self._opened_at + self._reset_timeout - time.time() if state == self.OPEN else None
+            if wait is not None and wait > 0:
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+            with self._lock:
+                self._state = self.HALF_OPEN
+            try:
+                ok = bool(self.probe())
+            except Exception:
+                ok = False
+            if ok:
+                self.record_success()
+            else:
+                with self._lock:
+                    self._open()
+                self._wake.clear()
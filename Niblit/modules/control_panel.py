@@ -5,8 +5,9 @@ class ControlPanel:
         self.modules = modules
 
     def status(self):
+        counts = self.db.counts()
         return {
-            "facts_count": len(self.db.data.get('facts',[])),
-            "interactions_count": len(self.db.data.get('interactions',[])),
+            "facts_count": counts['facts'],
+            "interactions_count": counts['interactions'],
             "available_modules": list(self.modules.keys())
         }
@@ -6,7 +6,8 @@ class CounterActiveMembrane:
         self.db = db
 
     def monitor(self):
-        facts = len(self.db.data.get('facts',[]))
-        interactions = len(self.db.data.get('interactions',[]))
+        counts = self.db.counts()
+        facts = counts['facts']
+        interactions = counts['interactions']
         llm_key = bool(os.getenv('HF_TOKEN'))
         return {"facts":facts,"interactions":interactions,"llm_key_present":llm_key}
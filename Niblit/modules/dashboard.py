@@ -4,8 +4,9 @@ from modules import llm_module
 
 def terminal_dashboard(db, modules):
     """Print a compact terminal dashboard summary."""
-    facts = len(db.data.get("facts", []))
-    interactions = len(db.data.get("interactions", []))
+    counts = db.counts()
+    facts = counts["facts"]
+    interactions = counts["interactions"]
     llm_key = bool(llm_module.HF_TOKEN)
     llm_online = llm_module.is_online() if llm_key else False
     lines = [
@@ -22,9 +23,10 @@ def terminal_dashboard(db, modules):
     return "\n".join(lines)
 
 def status_dict(db, modules):
+    counts = db.counts()
     return {
-        "facts": len(db.data.get("facts",[])),
-        "interactions": len(db.data.get("interactions",[])),
+        "facts": counts["facts"],
+        "interactions": counts["interactions"],
         "llm_token_present": bool(llm_module.HF_TOKEN),
         "llm_online": llm_module.is_online() if llm_module.HF_TOKEN else False,
         "modules": sorted(list(modules.keys())),
@@ -0,0 +1,84 @@
+# modules/http_pool.py
+"""Shared keep-alive HTTP layer for the LLM adapters.
+
+All adapters go through one requests HTTPAdapter, so TCP+TLS connections to
+a provider are reused across chat turns instead of re-handshaking on every
+call. Each thread gets its own requests.Session (sessions are not
+thread-safe), but every session mounts the same adapter, whose urllib3 pool
+is. Tune with env vars or configure():
+
+  NIBLIT_HTTP_POOL_HOSTS   distinct hosts kept pooled          (default 10)
+  NIBLIT_HTTP_POOL_SIZE    connections kept per host           (default 10)
+  NIBLIT_HTTP_RETRIES      retries on connect errors/429/5xx   (default 3)
+  NIBLIT_HTTP_BACKOFF      exponential backoff factor, seconds (default 0.5)
+"""
+import os, threading, logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+log = logging.getLogger("http-pool")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_local = threading.local()
+_adapter = None
+_generation = 0
+_config = {
+    "max_hosts": int(os.getenv("NIBLIT_HTTP_POOL_HOSTS", "10")),
+    "pool_size": int(os.getenv("NIBLIT_HTTP_POOL_SIZE", "10")),
+    "retries": int(os.getenv("NIBLIT_HTTP_RETRIES", "3")),
+    "backoff": float(os.getenv("NIBLIT_HTTP_BACKOFF", "0.5")),
+}
+
+def _build_adapter():
+    retry = Retry(
+        total=_config["retries"],
+        connect=_config["retries"],
+        read=0,  # a timed-out generation is not worth paying for twice
+        status=_config["retries"],
+        backoff_factor=_config["backoff"],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # chat completions are POSTs; retry them too
+        raise_on_status=False,
+    )
+    # pool_block caps concurrent connections per host at pool_size
+    return HTTPAdapter(pool_connections=_config["max_hosts"], pool_maxsize=_config["pool_size"],
+                       max_retries=retry, pool_block=True)
+
+def configure(pool_size=None, max_hosts=None, retries=None, backoff=None):
+    """Change pool settings; sessions pick up the new adapter on next use."""
+    global _adapter, _generation
+    with _lock:
+        for k, v in (("pool_size", pool_size), ("max_hosts", max_hosts), ("retries", retries), ("backoff", backoff)):
+            if v is not None:
+                _config[k] = v
+        old, _adapter = _adapter, None
+        _generation += 1
+    if old:
+        old.close()
+
+def get_session():
+    """Return this thread's session, bound to the shared connection pool."""
+    global _adapter
+    with _lock:
+        if _adapter is None:
+            _adapter = _build_adapter()
+        adapter, gen = _adapter, _generation
+    sess = getattr(_local, "session", None)
+    if sess is None or getattr(_local, "generation", -1) != gen:
+        sess = requests.Session()
+        sess.mount("https://", adapter)
+        sess.mount("http://", adapter)
+        _local.session, _local.generation = sess, gen
+    return sess
+
+def post(url, **kwargs):
+    return get_session().post(url, **kwargs)
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
+
+def close():
+    configure()
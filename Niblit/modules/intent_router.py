@@ -0,0 +1,136 @@
+# modules/intent_router.py
+"""Dispatch-table command routing.
+
+Handlers register with decorators on an IntentRouter:
+
+    router = IntentRouter()
+
+    @router.exact("help", "commands")
+    def _help(core, text, arg): ...
+
+    @router.prefix("remember ")
+    def _remember(core, text, arg): ...      # arg: the text after the prefix
+
+    @router.pattern(r"\\bweather\\b")
+    def _weather(core, text, arg): ...       # arg: the re.Match
+
+    router.dispatch(text, core)
+
+Input is normalized (stripped, lowercased) once. Lookup order is exact
+phrase (one dict lookup), then the longest registered prefix (one walk of a
+character trie, so the cost is bounded by the input length rather than the
+number of commands), then the first matching pattern (all patterns compiled
+into a single alternation). Prefix args keep the caller's original casing.
+"""
+import re
+import threading
+
+_END = object()  # trie key marking a registered prefix
+
+class Route:
+    __slots__ = ("handler", "kind", "arg", "text")
+
+    def __init__(self, handler, kind, arg, text):
+        self.handler = handler
+        self.kind = kind   # "exact" | "prefix" | "pattern" | "fallback"
+        self.arg = arg
+        self.text = text
+
+class IntentRouter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._trie = {}
+        self._patterns = []  # (regex source, handler)
+        self._combined = None
+        self._fallback = None
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(str(text or "").split()).lower()
+
+    # registration
+    def exact(self, *phrases):
+        def deco(fn):
+            for p in phrases:
+                self._exact[self.normalize(p)] = fn
+            return fn
+        return deco
+
+    def prefix(self, *prefixes):
+        def deco(fn):
+            for p in prefixes:
+                # keep a trailing space: "remember " must not match "remembered"
+                p = self.normalize(p) + (" " if p.endswith(" ") else "")
+                node = self._trie
+                for ch in p:
+                    node = node.setdefault(ch, {})
+                node[_END] = (fn, len(p))
+            return fn
+        return deco
+
+    def pattern(self, *regexes):
+        # patterns see the lowercased text; use named groups, not numbered ones
+        def deco(fn):
+            with self._lock:
+                for r in regexes:
+                    self._patterns.append((r, fn))
+                self._combined = None
+            return fn
+        return deco
+
+    def fallback(self, fn):
+        self._fallback = fn
+        return fn
+
+    # lookup
+    def _regex(self):
+        with self._lock:
+            if self._combined is None:
+                parts = [f"(?P<_r{i}>{r})" for i, (r, _) in enumerate(self._patterns)]
+                self._combined = re.compile("|".join(parts)) if parts else False
+            return self._combined
+
+    def resolve(self, text):
+        """Return the Route for `text`, or None when nothing (not even a fallback) matches."""
+        raw = " ".join(str(text or "").split())
+        low = raw.lower()
+        fn = self._exact.get(low)
+        if fn is not None:
+            return Route(fn, "exact", "", raw)
+        node, best = self._trie, None
+        for ch in low:
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node:
+                best = node[_END]
+        if best is not None:
+            return Route(best[0], "prefix", raw[best[1]:].strip(), raw)
+        rx = self._regex()
+        if rx:
+            m = rx.search(low)
+            if m:
+                return Route(self._patterns[int(m.lastgroup[2:])][1], "pattern", m, raw)
+        if self._fallback is not None:
+            return Route(self._fallback, "fallback", "", raw)
+        return None
+
+    def dispatch(self, text, *ctx):
+        """Resolve `text` and call handler(*ctx, text, arg); None if unrouted."""
+        route = self.resolve(text)
+        if route is None:
+            return None
+        return route.handler(*ctx, route.text, route.arg)
+
+    def commands(self):
+        """Registered exact phrases and prefixes, for help text."""
+        out, stack = list(self._exact), [("", self._trie)]
+        while stack:
+            prefix, node = stack.pop()
+            for ch, child in node.items():
+                if ch is _END:
+                    out.append(prefix.strip())
+                else:
+                    stack.append((prefix + ch, child))
+        return sorted(out)
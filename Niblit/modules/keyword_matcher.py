@@ -0,0 +1,50 @@
+# modules/keyword_matcher.py
+"""Multi-keyword substring matching in one pass.
+
+A KeywordMatcher compiles every keyword of every category into a single
+regex, so a message is scanned once for all of them instead of once per
+keyword. Matching keeps plain `keyword in text` semantics (case-insensitive
+substrings): the regex is a lookahead tried at each position, which finds
+the longest keyword starting there, and keywords contained in a hit (e.g.
+"thank" in "thanks") are credited with it.
+
+    EMOTIONS = KeywordMatcher({"positive": ["good", "thanks"], "negative": ["bad"]})
+    EMOTIONS.scan("Thanks, good job")   # {"positive": ["good", "thanks"], "negative": []}
+    EMOTIONS.counts("bad, bad")         # {"positive": 0, "negative": 1}
+"""
+import re
+
+class KeywordMatcher:
+    def __init__(self, categories):
+        # keep lists as given: a keyword listed twice counts twice, as with a loop of `in` checks
+        self.categories = {c: [w.lower() for w in words] for c, words in categories.items()}
+        words = sorted({w for ws in self.categories.values() for w in ws}, key=len, reverse=True)
+        self._implied = {w: [o for o in words if o != w and o in w] for w in words}
+        alternation = "|".join(map(re.escape, words))
+        self._scan = re.compile(f"(?=({alternation}))") if words else None
+        self._any = re.compile(alternation) if words else None
+
+    def keywords(self, text):
+        """Set of all keywords occurring in `text`."""
+        found = set()
+        if self._scan is None or not text:
+            return found
+        for m in self._scan.finditer(text.lower()):
+            w = m.group(1)
+            if w not in found:
+                found.add(w)
+                found.update(self._implied[w])
+        return found
+
+    def scan(self, text, found=None):
+        """Keywords found per category (every category present, possibly empty)."""
+        found = self.keywords(text) if found is None else found
+        return {c: [w for w in words if w in found] for c, words in self.categories.items()}
+
+    def counts(self, text, found=None):
+        found = self.keywords(text) if found is None else found
+        return {c: sum(1 for w in words if w in found) for c, words in self.categories.items()}
+
+    def search(self, text):
+        """True as soon as any keyword occurs; stops at the first hit."""
+        return bool(self._any is not None and text and self._any.search(text.lower()))
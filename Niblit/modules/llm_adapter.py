@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODULES_DIR = os.path.join(BASE_DIR, "modules")
@@ -8,36 +7,43 @@ if MODULES_DIR not in sys.path:
     sys.path.insert(0, MODULES_DIR)
 
 from modules.llm_module import HFLLMAdapter
+from modules.response_cache import ResponseCache, make_key
+from modules.context_window import approx_tokens, trim_to_budget
+
+# token cap on the last 10 interactions sent with each query (newest first until full)
+CONTEXT_TOKENS = int(os.getenv("NIBLIT_CONTEXT_TOKENS", "1536"))
 
 class LLMAdapter:
-    def __init__(self, db):
+    def __init__(self, db, cache=None):
         self.db = db
         self.provider = HFLLMAdapter()
-
-        # Prevents first-call AttributeError
-        self._last_check = 0
-        self._last_result = False
+        # reply cache: NIBLIT_LLM_CACHE_* env vars, or pass one in
+        self.cache = cache if cache is not None else ResponseCache.from_env()
 
     def is_available(self):
+        # the provider's circuit breaker tracks health from real calls and
+        # probes in the background; this is just a flag read
         try:
-            if time.time() - self._last_check < 10:
-                return self._last_result
-
-            ok = self.provider.is_online()
-            self._last_check = time.time()
-            self._last_result = ok
-            return ok
-
+            return self.provider.is_online()
         except Exception:
             return False
 
-    def query(self, prompt, context=None, max_tokens=300, model=None):
+    def recall(self, prompt):
+        """The stored fact most relevant to the prompt (BM25 via db.search_facts), or None."""
+        if self.db is not None and hasattr(self.db, "search_facts"):
+            facts = self.db.search_facts(prompt, 1)
+            if facts:
+                return f"I recall: {facts[0]['value']}"
+        return None
+
+    def query(self, prompt, context=None, max_tokens=300, model=None, stream=False):
         messages = [
             {"role": "system", "content": "You are Niblit — a concise, helpful assistant."}
         ]
 
         if context:
-            for it in context[-10:]:
+            budget = CONTEXT_TOKENS - approx_tokens(prompt)
+            for it in trim_to_budget(context[-10:], budget, text=lambda it: it.get("text", "")):
                 messages.append({
                     "role": it.get("role", "user"),
                     "content": it.get("text", "")
@@ -45,4 +51,38 @@ class LLMAdapter:
 
         messages.append({"role": "user", "content": prompt})
 
-        return self.provider.query_llm(messages, model=model, max_tokens=max_tokens)
+        key = make_key(model or self.provider.model, messages, max_tokens) if self.cache else None
+        cached = self.cache.get(key) if key else None
+
+        if stream:
+            if cached is not None:
+                return iter([cached])
+            return self._stream(messages, model, max_tokens, key)
+
+        if cached is not None:
+            return cached
+
+        reply = self.provider.query_llm(messages, model=model, max_tokens=max_tokens)
+        if reply.startswith("[HF ERROR]"):
+            # provider down: answer from memory when a stored fact matches
+            return self.recall(prompt) or reply
+        self._store(key, reply)
+        return reply
+
+    def _store(self, key, reply):
+        # provider errors come back as "[HF ERROR] ..." strings; never cache them
+        if key and reply and not reply.startswith("[HF ERROR]"):
+            self.cache.put(key, reply)
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache else {}
+
+    def _stream(self, messages, model, max_tokens, key=None):
+        parts = []
+        try:
+            for tok in self.provider.stream_llm(messages, model=model, max_tokens=max_tokens):
+                parts.append(tok)
+                yield tok
+            self._store(key, "".join(parts))
+        except Exception as e:
+            yield f"[HF ERROR] {str(e)}"
@@ -1,9 +1,14 @@
 # modules/llm_module.py
 
 import os
+import json
 import time
+
 import requests
 
+from modules import http_pool
+from modules.circuit_breaker import CircuitBreaker
+
 HF_API_URL = "https://router.huggingface.co/v1/chat/completions"
 
 class HFLLMAdapter:
@@ -17,16 +22,38 @@ class HFLLMAdapter:
 
         self.model = "moonshotai/Kimi-K2-Instruct-0905"
 
+        # availability comes from real call outcomes; the probe only runs in
+        # the breaker's background thread while the circuit is open
+        self.breaker = CircuitBreaker(probe=self.probe, name="hf")
+        self.breaker.check_now()
+
     # ---------------------------
     # CHECK IF HF IS ONLINE
     # ---------------------------
     def is_online(self):
+        # hot path: a flag read, never a network call
+        return self.breaker.is_available()
+
+    def probe(self):
         try:
-            r = requests.get("https://huggingface.co", timeout=3)
+            r = http_pool.get("https://huggingface.co", timeout=3)
             return r.status_code == 200
         except Exception:
             return False
 
+    def _record(self, error=None):
+        # network errors, timeouts, 429 and 5xx mean "unavailable"; other
+        # HTTP errors (bad token, bad payload) still prove the host is up
+        if error is None:
+            self.breaker.record_success()
+            return
+        resp = getattr(error, "response", None)
+        status = getattr(resp, "status_code", None)
+        if isinstance(error, requests.exceptions.RequestException) and (status is None or status == 429 or status >= 500):
+            self.breaker.record_failure()
+        elif status is not None:
+            self.breaker.record_success()
+
     # ---------------------------
     # SEND MESSAGE TO HF LLM
     # ---------------------------
@@ -45,12 +72,53 @@ class HFLLMAdapter:
         }
 
         try:
-            r = requests.post(HF_API_URL, json=payload, headers=headers, timeout=20)
+            r = http_pool.post(HF_API_URL, json=payload, headers=headers, timeout=20)
             r.raise_for_status()
+            self._record()
             data = r.json()
 
             # HF-compatible output
             return data["choices"][0]["message"]["content"]
 
         except Exception as e:
+            self._record(e)
             return f"[HF ERROR] {str(e)}"
+
+
+    # ---------------------------
+    # STREAM MESSAGE FROM HF LLM
+    # ---------------------------
+    def stream_llm(self, messages, model=None, max_tokens=300):
+        """Yield reply tokens from the router's SSE stream."""
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "text/event-stream",
+        }
+
+        try:
+            r = http_pool.post(HF_API_URL, json=payload, headers=headers, timeout=20, stream=True)
+            r.raise_for_status()
+        except Exception as e:
+            self._record(e)
+            raise
+        self._record()
+        with r:
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta") or {}
+                except (ValueError, KeyError, IndexError):
+                    continue
+                if delta.get("content"):
+                    yield delta["content"]
@@ -0,0 +1,60 @@
+# modules/memory_query.py
+"""Paging, filters, ETags and NDJSON streaming for the /memory endpoints.
+
+Stores implement query_facts(prefix, tag, since, until, cursor, limit),
+which returns (page, next_cursor) with next_cursor None on the last page,
+plus a `generation` counter that is bumped on every change. The ETag is
+that generation plus a per-process token, because counters restart at 0.
+A poll with a matching If-None-Match gets 304 without running a query.
+
+Query string: prefix, tag, since, until (unix seconds), cursor, limit
+(default per endpoint, at most NIBLIT_MEMORY_PAGE_MAX=1000), and
+format=ndjson to stream every match one line at a time.
+"""
+import os, json, time
+
+MAX_LIMIT = int(os.getenv("NIBLIT_MEMORY_PAGE_MAX", "1000"))
+STREAM_BATCH = 500
+_BOOT = format(int(time.time() * 1000), "x")
+
+def _number(params, name, cast=float):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+def parse_query(params, default_limit=50):
+    """(filters, cursor, limit, stream) from a query-string mapping; ValueError on bad input."""
+    filters = {
+        "prefix": params.get("prefix") or None,
+        "tag": params.get("tag") or None,
+        "since": _number(params, "since"),
+        "until": _number(params, "until"),
+    }
+    limit = _number(params, "limit", int) or default_limit
+    limit = max(1, min(limit, MAX_LIMIT))
+    stream = params.get("format") == "ndjson"
+    return filters, params.get("cursor") or None, limit, stream
+
+def etag(store):
+    return f'"{_BOOT}-{getattr(store, "generation", 0)}"'
+
+def not_modified(if_none_match, tag):
+    """True if an If-None-Match header value matches `tag`."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or tag in tags or ("W/" + tag) in tags
+
+def iter_ndjson(store, filters, batch=STREAM_BATCH):
+    """Every match as one JSON line, fetched a page at a time."""
+    cursor = None
+    while True:
+        page, cursor = store.query_facts(cursor=cursor, limit=batch, **filters)
+        if page:
+            yield "".join(json.dumps(item, ensure_ascii=False, default=str) + "\n" for item in page)
+        if cursor is None:
+            return
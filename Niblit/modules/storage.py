@@ -1,5 +1,7 @@
 # modules/storage.py
-import json, os, time
+import json, os, time, sqlite3, threading
+from collections import Counter
+from modules.fact_index import FactIndex
 
 def now_ts():
     return int(time.time())
@@ -13,6 +15,8 @@ class KnowledgeDB:
             'personality': {'mood':'neutral','verbosity':'medium'},
             'meta': {}
         }
+        self._index = None  # FactIndex keyed by position in data['facts'], built on first search
+        self.generation = 0  # bumped on every fact change; drives /memory ETags
         self._load()
 
     def _load(self):
@@ -35,18 +39,50 @@ class KnowledgeDB:
     # facts
     def add_fact(self,key,value,tags=None):
         tags = tags or []
-        self.data['facts'].append({'key':key,'value':value,'tags':tags,'ts':now_ts()})
+        fact = {'key':key,'value':value,'tags':tags,'ts':now_ts()}
+        self.data['facts'].append(fact)
+        if self._index is not None:
+            self._index.add(len(self.data['facts'])-1,key,value,fact)
+        self.generation += 1
         self._save()
 
     def forget(self,key):
         before = len(self.data['facts'])
         self.data['facts'] = [f for f in self.data['facts'] if f['key'] != key]
+        self._index = None
+        self.generation += 1
         self._save()
         return before - len(self.data['facts'])
 
     def list_facts(self,limit=50):
         return list(reversed(self.data['facts'][-limit:]))
 
+    def query_facts(self,prefix=None,tag=None,since=None,until=None,cursor=None,limit=50):
+        """One page of facts, newest first, plus the cursor for the next page (None at the end).
+
+        Ids are positions in the file, so a forget()/condense() between pages
+        shifts them; the generation (and ETag) changes when that happens.
+        """
+        facts = self.data['facts']
+        i = min(_int(cursor,len(facts)+1)-1, len(facts))
+        out = []
+        while i > 0 and len(out) <= limit:
+            i -= 1
+            f = facts[i]
+            if ((prefix and not str(f.get('key','')).startswith(prefix)) or (tag and tag not in (f.get('tags') or []))
+                    or (since is not None and f.get('ts',0) < since) or (until is not None and f.get('ts',0) >= until)):
+                continue
+            out.append(dict(f, id=i+1))
+        return out[:limit], (out[limit-1]['id'] if len(out) > limit else None)
+
+    def search_facts(self,query,limit=5):
+        """Facts ranked by BM25 relevance to `query`, best first."""
+        if self._index is None:
+            self._index = FactIndex()
+            for i,f in enumerate(self.data['facts']):
+                self._index.add(i,f.get('key'),f.get('value'),f)
+        return [f for _,_,f in self._index.search(query,limit)]
+
     # interactions
     def add_interaction(self,role,text):
         self.data['interactions'].append({'ts':now_ts(),'role':role,'text':text})
@@ -62,11 +98,229 @@ class KnowledgeDB:
 
     def condense(self,keep_top=20):
         # very simple condense: top words from interactions
-        texts = ' '.join([it['text'] for it in self.data['interactions'] if it['role']=='user'])
-        toks = [t.lower().strip('.,!?') for t in texts.split() if len(t)>3]
-        from collections import Counter
-        top = Counter(toks).most_common(keep_top)
-        condensed = [{'key':f'common_{i+1}','value':w,'tags':['condensed'],'ts':now_ts()} for i,(w,_) in enumerate(top)]
+        condensed = _condense_texts([it['text'] for it in self.data['interactions'] if it['role']=='user'], keep_top)
         self.data['facts'] = condensed + self.data['facts']
+        self._index = None
+        self.generation += 1
+        self._save()
+        return condensed
+
+    # housekeeping
+    def counts(self):
+        return {'facts':len(self.data.get('facts',[])),'interactions':len(self.data.get('interactions',[]))}
+
+    def prune_interactions(self,cutoff_ts):
+        before = len(self.data['interactions'])
+        self.data['interactions'] = [i for i in self.data['interactions'] if i['ts'] >= cutoff_ts]
         self._save()
+        return before - len(self.data['interactions'])
+
+
+def _int(value,default=None):
+    try:
+        return int(value)
+    except (TypeError,ValueError):
+        return default
+
+def _condense_texts(texts,keep_top):
+    # very simple condense: top words from user interactions
+    toks = [t.lower().strip('.,!?') for t in ' '.join(texts).split() if len(t)>3]
+    top = Counter(toks).most_common(keep_top)
+    return [{'key':f'common_{i+1}','value':w,'tags':['condensed'],'ts':now_ts()} for i,(w,_) in enumerate(top)]
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS facts(id INTEGER PRIMARY KEY, key TEXT, value TEXT, tags TEXT, ts INTEGER)",
+    "CREATE TABLE IF NOT EXISTS fact_tags(fact_id INTEGER REFERENCES facts(id) ON DELETE CASCADE, tag TEXT)",
+    "CREATE TABLE IF NOT EXISTS interactions(id INTEGER PRIMARY KEY, ts INTEGER, role TEXT, text TEXT)",
+    "CREATE TABLE IF NOT EXISTS kv(key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_facts_key ON facts(key)",
+    "CREATE INDEX IF NOT EXISTS idx_facts_ts ON facts(ts)",
+    "CREATE INDEX IF NOT EXISTS idx_fact_tags_tag ON fact_tags(tag)",
+    "CREATE INDEX IF NOT EXISTS idx_fact_tags_fact ON fact_tags(fact_id)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions(ts)",
+]
+
+MAX_INTERACTIONS = 500
+
+class SQLiteKnowledgeDB:
+    """Drop-in KnowledgeDB backed by SQLite in WAL mode.
+
+    Every write is a single indexed insert/delete instead of a full JSON
+    rewrite. If `json_path` exists and the database is empty, its contents
+    are imported once on open (see migrate_json).
+    """
+    def __init__(self, path='niblit_memory.db', json_path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self._index = None  # FactIndex keyed by facts.id, built on first search
+        self.generation = 0  # bumped on every fact change; drives /memory ETags
+        with self.conn:
+            for stmt in SCHEMA:
+                self.conn.execute(stmt)
+        if self._get_kv('personality') is None:
+            self._set_kv('personality', {'mood':'neutral','verbosity':'medium'})
+        if json_path and os.path.exists(json_path) and not self._get_kv('migrated_from'):
+            self.migrate_json(json_path)
+
+    def _get_kv(self,key):
+        row = self.conn.execute('SELECT value FROM kv WHERE key=?',(key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_kv(self,key,value):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO kv(key,value) VALUES(?,?)',(key,json.dumps(value,ensure_ascii=False)))
+
+    def _insert_fact(self,key,value,tags,ts,fact_id=None):
+        cur = self.conn.execute('INSERT INTO facts(id,key,value,tags,ts) VALUES(?,?,?,?,?)',
+                                (fact_id,key,value,json.dumps(tags,ensure_ascii=False),ts))
+        if self._index is not None:
+            self._index.add(cur.lastrowid,key,value,{'key':key,'value':value,'tags':tags,'ts':ts})
+        if tags:
+            self.conn.executemany('INSERT INTO fact_tags(fact_id,tag) VALUES(?,?)',[(cur.lastrowid,t) for t in tags])
+        self.generation += 1
+
+    def _save(self):
+        # writes are committed as they happen; kept for KnowledgeDB parity
+        with self._lock:
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def migrate_json(self,json_path):
+        """One-shot import of a KnowledgeDB JSON file. Returns rows imported."""
+        with open(json_path,'r',encoding='utf-8') as f:
+            data = json.load(f)
+        facts = data.get('facts',[]) if isinstance(data,dict) else []
+        inters = (data.get('interactions',[]) if isinstance(data,dict) else [])[-MAX_INTERACTIONS:]
+        with self._lock, self.conn:
+            for fa in facts:
+                self._insert_fact(fa.get('key'),fa.get('value'),fa.get('tags') or [],fa.get('ts',now_ts()))
+            self.conn.executemany('INSERT INTO interactions(ts,role,text) VALUES(?,?,?)',
+                                  [(it.get('ts',now_ts()),it.get('role','user'),it.get('text','')) for it in inters])
+            if isinstance(data,dict) and data.get('personality'):
+                self.conn.execute('INSERT OR REPLACE INTO kv(key,value) VALUES(?,?)',
+                                  ('personality',json.dumps(data['personality'],ensure_ascii=False)))
+            self.conn.execute('INSERT OR REPLACE INTO kv(key,value) VALUES(?,?)',
+                              ('migrated_from',json.dumps({'path':json_path,'ts':now_ts()})))
+        return len(facts) + len(inters)
+
+    # facts
+    def add_fact(self,key,value,tags=None):
+        with self._lock, self.conn:
+            self._insert_fact(key,value,tags or [],now_ts())
+
+    def forget(self,key):
+        with self._lock, self.conn:
+            if self._index is not None:
+                for (fid,) in self.conn.execute('SELECT id FROM facts WHERE key=?',(key,)).fetchall():
+                    self._index.remove(fid)
+            removed = self.conn.execute('DELETE FROM facts WHERE key=?',(key,)).rowcount
+            if removed:
+                self.generation += 1
+            return removed
+
+    def list_facts(self,limit=50):
+        with self._lock:
+            rows = self.conn.execute('SELECT key,value,tags,ts FROM facts ORDER BY id DESC LIMIT ?',(limit,)).fetchall()
+        return [{'key':k,'value':v,'tags':json.loads(t or '[]'),'ts':ts} for k,v,t,ts in rows]
+
+    def query_facts(self,prefix=None,tag=None,since=None,until=None,cursor=None,limit=50):
+        """One page of facts, newest first, plus the cursor for the next page (None at the end).
+
+        Keyset pagination on facts.id, so deep pages cost the same as the first.
+        """
+        where, args = [], []
+        if prefix:
+            where.append('key>=? AND key<?')  # range scan on idx_facts_key
+            args += [prefix, prefix+'\U0010ffff']
+        if tag:
+            where.append('EXISTS (SELECT 1 FROM fact_tags t WHERE t.fact_id=facts.id AND t.tag=?)')
+            args.append(tag)
+        if since is not None:
+            where.append('ts>=?'); args.append(since)
+        if until is not None:
+            where.append('ts<?'); args.append(until)
+        if _int(cursor) is not None:
+            where.append('id<?'); args.append(_int(cursor))
+        sql = 'SELECT id,key,value,tags,ts FROM facts' + (' WHERE ' + ' AND '.join(where) if where else '')
+        with self._lock:
+            rows = self.conn.execute(sql + ' ORDER BY id DESC LIMIT ?',args + [limit+1]).fetchall()
+        out = [{'id':i,'key':k,'value':v,'tags':json.loads(t or '[]'),'ts':ts} for i,k,v,t,ts in rows[:limit]]
+        return out, (out[-1]['id'] if len(rows) > limit else None)
+
+    def search_facts(self,query,limit=5):
+        """Facts ranked by BM25 relevance to `query`, best first."""
+        with self._lock:
+            if self._index is None:
+                self._index = FactIndex()
+                for fid,k,v,t,ts in self.conn.execute('SELECT id,key,value,tags,ts FROM facts ORDER BY id'):
+                    self._index.add(fid,k,v,{'key':k,'value':v,'tags':json.loads(t or '[]'),'ts':ts})
+            return [f for _,_,f in self._index.search(query,limit)]
+
+    def facts_by_tag(self,tag,limit=50):
+        with self._lock:
+            rows = self.conn.execute('SELECT f.key,f.value,f.tags,f.ts FROM facts f JOIN fact_tags t ON t.fact_id=f.id '
+                                     'WHERE t.tag=? ORDER BY f.id DESC LIMIT ?',(tag,limit)).fetchall()
+        return [{'key':k,'value':v,'tags':json.loads(t or '[]'),'ts':ts} for k,v,t,ts in rows]
+
+    # interactions
+    def add_interaction(self,role,text):
+        with self._lock, self.conn:
+            rid = self.conn.execute('INSERT INTO interactions(ts,role,text) VALUES(?,?,?)',(now_ts(),role,text)).lastrowid
+            # trim in batches so the common path stays a single insert
+            if rid % 50 == 0:
+                self.conn.execute('DELETE FROM interactions WHERE id<=?',(rid-MAX_INTERACTIONS,))
+
+    def recent_interactions(self,n=20):
+        with self._lock:
+            rows = self.conn.execute('SELECT ts,role,text FROM interactions ORDER BY id DESC LIMIT ?',(n,)).fetchall()
+        return [{'ts':ts,'role':r,'text':t} for ts,r,t in reversed(rows)]
+
+    def get_personality(self):
+        with self._lock:
+            return self._get_kv('personality') or {}
+
+    def condense(self,keep_top=20):
+        with self._lock:
+            rows = self.conn.execute("SELECT text FROM interactions WHERE role='user' ORDER BY id DESC LIMIT ?",
+                                     (MAX_INTERACTIONS,)).fetchall()
+            condensed = _condense_texts([r[0] for r in reversed(rows)], keep_top)
+            # like the JSON store (condensed + facts), condensed facts go before
+            # every existing one: ids below the current minimum, so newest-first
+            # listings and /memory pages keep showing real facts first
+            first = self.conn.execute('SELECT MIN(id) FROM facts').fetchone()[0]
+            first = (first if first is not None else 1) - len(condensed)
+            with self.conn:
+                for i,c in enumerate(condensed):
+                    self._insert_fact(c['key'],c['value'],c['tags'],c['ts'],fact_id=first+i)
         return condensed
+
+    # housekeeping
+    def counts(self):
+        with self._lock:
+            facts = self.conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+            inters = self.conn.execute('SELECT COUNT(*) FROM interactions').fetchone()[0]
+        return {'facts':facts,'interactions':inters}
+
+    def prune_interactions(self,cutoff_ts):
+        with self._lock, self.conn:
+            return self.conn.execute('DELETE FROM interactions WHERE ts<?',(cutoff_ts,)).rowcount
+
+
+def open_knowledge_db(path='niblit_memory.json', engine=None):
+    """Open the configured storage engine ('sqlite' by default, or 'json').
+
+    The SQLite file lives next to the JSON path and imports it on first use.
+    Set NIBLIT_STORAGE=json to keep the legacy single-file store.
+    """
+    engine = (engine or os.getenv('NIBLIT_STORAGE','sqlite')).lower()
+    if engine == 'json':
+        return KnowledgeDB(path)
+    return SQLiteKnowledgeDB(os.path.splitext(path)[0] + '.db', json_path=path)
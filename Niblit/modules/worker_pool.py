@@ -0,0 +1,132 @@
+# modules/worker_pool.py
+"""Bounded thread pool for running blocking core/LLM calls from async code.
+
+FastAPI handlers await BoundedExecutor.run(fn, ...) instead of calling a
+blocking function on the event loop, so one slow LLM request no longer
+stalls /health or other users. stream() does the same for generators
+(token streams) and holds one worker for the whole stream. At most
+`max_workers` calls run at once and at most `max_queue` more may wait;
+beyond that run() and stream() raise Overloaded so the API can answer 503
+instead of piling up requests. Configure with
+NIBLIT_API_WORKERS (default 8) and NIBLIT_API_QUEUE (default 64).
+"""
+import os, asyncio, threading, functools
+from concurrent.futures import ThreadPoolExecutor
+
+class Overloaded(RuntimeError):
+    pass
+
+class BoundedExecutor:
+    def __init__(self, max_workers=None, max_queue=None, name="niblit-worker"):
+        self.max_workers = max_workers or int(os.getenv("NIBLIT_API_WORKERS", "8"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("NIBLIT_API_QUEUE", "64"))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0   # submitted, not yet finished
+        self._active = 0    # currently running on a worker
+        self._completed = 0
+        self._rejected = 0
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _reserve(self, take=True):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise Overloaded("worker queue full")
+            if take:
+                self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        self._reserve()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(self._call, fn, args, kwargs))
+        finally:
+            self._release()
+
+    def stream(self, fn, *args, **kwargs):
+        """Async iterator over the items of the generator fn(*args, **kwargs).
+
+        The generator runs on one worker and holds it until it is exhausted
+        or the consumer stops, so streams count against the same bound as
+        run(). Raises Overloaded here, before the response starts, when the
+        pool is already full.
+        """
+        self._reserve(take=False)  # the slot itself is taken when iteration starts
+        return self._stream(fn, args, kwargs)
+
+    async def _stream(self, fn, args, kwargs):
+        self._reserve()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(msg):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, msg)
+            except RuntimeError:
+                pass  # event loop already closed
+
+        def pump():
+            with self._lock:
+                self._active += 1
+            gen = None
+            try:
+                gen = fn(*args, **kwargs)
+                for item in gen:
+                    if stop.is_set():
+                        break
+                    put((True, item))
+            except Exception as e:
+                put((False, e))
+            finally:
+                close = getattr(gen, "close", None)
+                if close:
+                    close()
+                with self._lock:
+                    self._active -= 1
+                self._release()  # here, not on the loop: the slot is free before the end marker
+                put((False, None))
+
+        try:
+            loop.run_in_executor(self._pool, pump)
+        except BaseException:
+            self._release()
+            raise
+        try:
+            while True:
+                ok, item = await queue.get()
+                if not ok:
+                    if item is not None:
+                        raise item
+                    return
+                yield item
+        finally:
+            stop.set()  # consumer gone: the worker stops at the next item
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._pending - self._active,
+                "queue_limit": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait=False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
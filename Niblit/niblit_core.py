@@ -13,7 +13,7 @@ if MODULES_PATH not in sys.path:
 
 # --- Import modules ---
 from modules.self_researcher import SelfResearcher
-from modules.storage import KnowledgeDB
+from modules.storage import open_knowledge_db
 from modules.llm_adapter import LLMAdapter
 from modules.analytics import AnalyticsModule
 from modules.antifraud import AntiFraudModule
@@ -34,6 +34,8 @@ from modules.bootloader import Bootloader
 from modules.filesystem_manager import FileSystemManager
 from modules.terminal_tools import TerminalTools
 from modules.permission_manager import PermissionManager
+from modules.intent_router import IntentRouter
+from modules.status_feed import StatusFeed
 
 # --- Memory & Logs ---
 MEMORY_FILE = os.path.join(BASE_DIR, "niblit_memory.json")
@@ -46,9 +48,50 @@ def now_ts():
 def timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+# --- Command routing ---
+commands = IntentRouter()
+
+@commands.pattern("help")
+def _cmd_help(core, text, arg):
+    return core.help_text()
+
+@commands.prefix("toggle-llm")
+def _cmd_toggle_llm(core, text, arg):
+    parts = text.lower().split()
+    if len(parts) == 2 and parts[1] in ("on", "off"):
+        return core.toggle_llm(parts[1] == "on")
+    return "[TOGGLE ERROR] Usage: toggle-llm on/off"
+
+@commands.prefix("self-research")
+def _cmd_self_research(core, text, arg):
+    parts = text.split(" ", 2)
+    # Natural query (self-research <query>)
+    if len(parts) == 2:
+        return core.self_researcher.handle_command("web.run", parts[1])
+    # Explicit command + argument
+    if len(parts) >= 3:
+        return core.self_researcher.handle_command(parts[1], parts[2])
+    return "[RESEARCH ERROR] Usage: self-research <cmd> <arg> or self-research <natural query>"
+
+@commands.fallback
+def _cmd_chat(core, text, arg):
+    # --- LLM ---
+    if core.llm_enabled and core.llm.is_available():
+        try:
+            return core.llm.query(text, context=core.db.recent_interactions(20))
+        except Exception as e:
+            return core.llm.recall(text) or f"I heard you say: \"{text}\" (LLM error: {e})"
+    if core.llm_enabled:
+        # provider offline: the best matching stored fact beats an echo
+        recalled = core.llm.recall(text)
+        if recalled:
+            return recalled
+    # fallback / raw data mode
+    return f"[RAW DATA MODE] You said: \"{text}\""
+
 class NiblitCore:
     def __init__(self, memory_path=MEMORY_FILE):
-        self.db = KnowledgeDB(memory_path)
+        self.db = open_knowledge_db(memory_path)
         self.personality = self.db.get_personality()
 
         # --- External LLM toggle ---
@@ -105,6 +148,9 @@ class NiblitCore:
         # Reload last chat context
         self.context = self.db.recent_interactions(50)
 
+        # Dashboard status, pushed to subscribers only when it changes
+        self.status_feed = StatusFeed(self.status_snapshot)
+
     # --- Chat Logging ---
     def log_chat(self, role, message):
         date_file = os.path.join(CHAT_LOG_DIR, f"{datetime.now().strftime('%Y-%m-%d')}.txt")
@@ -116,53 +162,38 @@ class NiblitCore:
     def handle(self, text: str):
         text = text.strip()
         self.log_chat("user", text)
-        low = text.lower()
-        response = None
-
-        # --- Help ---
-        if 'help' in low:
-            response = self.help_text()
-
-        # --- Toggle LLM command ---
-        elif low.startswith("toggle-llm"):
-            parts = low.split()
-            if len(parts) == 2 and parts[1] in ("on", "off"):
-                response = self.toggle_llm(parts[1] == "on")
-            else:
-                response = "[TOGGLE ERROR] Usage: toggle-llm on/off"
-
-        # --- Self-Research Commands ---
-        elif low.startswith("self-research"):
-            parts = text.split(" ", 2)
-
-            # Natural query (self-research <query>)
-            if len(parts) == 2:
-                query = parts[1]
-                response = self.self_researcher.handle_command("web.run", query)
-
-            # Explicit command + argument
-            elif len(parts) >= 3:
-                cmd = parts[1]
-                arg = parts[2]
-                response = self.self_researcher.handle_command(cmd, arg)
-
-            else:
-                response = "[RESEARCH ERROR] Usage: self-research <cmd> <arg> or self-research <natural query>"
-
-        # --- LLM ---
-        elif self.llm_enabled and self.llm.is_available():
-            try:
-                response = self.llm.query(text, context=self.db.recent_interactions(20))
-            except Exception as e:
-                response = f"I heard you say: \"{text}\" (LLM error: {e})"
-
-        else:
-            # fallback / raw data mode
-            response = f"[RAW DATA MODE] You said: \"{text}\""
-
+        response = commands.dispatch(text, self)
         self.log_chat("assistant", response)
         return response
 
+    # --- Handle input, streaming ---
+    def handle_stream(self, text: str):
+        """Like handle(), but yields LLM tokens as they arrive.
+
+        Commands and fallback modes yield their reply as a single chunk. The
+        full reply is logged once the stream completes.
+        """
+        text = text.strip()
+        low = text.lower()
+        if not (self.llm_enabled and not self._is_command(low) and self.llm.is_available()):
+            yield self.handle(text)
+            return
+        self.log_chat("user", text)
+        parts = []
+        try:
+            for tok in self.llm.query(text, context=self.db.recent_interactions(20), stream=True):
+                parts.append(tok)
+                yield tok
+        except Exception as e:
+            tail = f" (LLM error: {e})"
+            parts.append(tail)
+            yield tail
+        finally:
+            self.log_chat("assistant", "".join(parts))
+
+    def _is_command(self, low):
+        return commands.resolve(low).kind != "fallback"
+
     # --- Toggle LLM ---
     def toggle_llm(self, on: bool):
         self.llm_enabled = on
@@ -193,6 +224,15 @@ class NiblitCore:
             "  write-file <path> <text>\n"
         )
 
+    # --- Dashboard status ---
+    def status_snapshot(self):
+        return {
+            "status": "ok",
+            "personality": self.db.get_personality(),
+            "memory": self.db.counts(),
+            "llm_enabled": self.llm_enabled,
+        }
+
     # --- Save memory ---
     def save_all(self):
         self.db._save()
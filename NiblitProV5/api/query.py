@@ -1,26 +1,48 @@
 # api/query.py
 import asyncio
+import json
+import threading
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from modules.worker_pool import BoundedExecutor, Overloaded
+from modules.sessions import clean_session_id
+
 # Lazy-loading globals
 core = None
-llm = None
+_init_lock = threading.Lock()
+
+# Blocking core/LLM calls (including the lazy init) run here, off the event loop
+pool = BoundedExecutor()
 
 def get_core():
     global core
     if core is None:
-        from niblit_core_refactor import niblitcore
-        core = niblitcore()
+        with _init_lock:
+            if core is None:
+                from niblit_core_refactor import niblitcore
+                core = niblitcore()
     return core
 
 def get_llm():
-    global llm
+    # the core owns one long-lived adapter; reuse it rather than building another
+    return get_core().llm_backend()
+
+def _session_id(request, data):
+    # per-client history in the core; anonymous callers share "default"
+    return clean_session_id(data.get("session_id") or request.headers.get("x-session-id"))
+
+def _ask_llm(prompt, context, stream=False, session_id=None):
+    llm = get_llm()
     if llm is None:
-        from modules.llm_adapter import LLMAdapter
-        llm = LLMAdapter(db=get_core().memory)
-    return llm
+        # backend cooling down after failures: answer from the core instead
+        reply = get_core().respond(prompt, session_id)
+        return iter([reply]) if stream else reply
+    return llm.query(prompt, context, stream=stream)
+
+def _busy():
+    return JSONResponse({"error": "busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
 
 # FastAPI app
 app = FastAPI()
@@ -34,11 +56,15 @@ app.add_middleware(
 
 @app.get("/health")
 async def health():
-    c = get_core()
+    try:
+        c = core or await pool.run(get_core)
+    except Overloaded:
+        return _busy()
     return {
         "status": "alive",
         "uptime_s": getattr(c, "current_time_seconds", lambda: 0)(),
-        "memory_entries": getattr(c.memory, "count", 0)
+        "memory_entries": getattr(c.memory, "count", 0),
+        "workers": pool.stats()
     }
 
 @app.post("/query")
@@ -47,12 +73,46 @@ async def query(request: Request):
     prompt = data.get("prompt", "")
     use_llm = data.get("llm", True)
     context = data.get("context", [])
+    sid = _session_id(request, data)
 
     try:
         if use_llm:
-            response = get_llm().query(prompt, context)
+            response = await pool.run(_ask_llm, prompt, context, False, sid)
         else:
-            response = get_core().respond(prompt)
+            response = await pool.run(lambda: get_core().respond(prompt, sid))
         return JSONResponse({"response": response})
+    except Overloaded:
+        return _busy()
     except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=500)
\ No newline at end of file
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+def _sse(make_chunks, *args):
+    # runs on a pool worker for the whole stream, LLM HTTP work included
+    try:
+        for tok in make_chunks(*args):
+            yield f"data: {json.dumps({'token': tok})}\n\n"
+    except Exception as e:
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    yield "data: [DONE]\n\n"
+
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    data = await request.json()
+    prompt = data.get("prompt", "")
+    use_llm = data.get("llm", True)
+    context = data.get("context", [])
+    sid = _session_id(request, data)
+
+    try:
+        if use_llm:
+            body = pool.stream(_sse, _ask_llm, prompt, context, True, sid)
+        else:
+            body = pool.stream(_sse, lambda: iter([get_core().respond(prompt, sid)]))
+    except Overloaded:
+        return _busy()
+    return StreamingResponse(body, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.on_event("shutdown")
+def _stop_workers():
+    pool.shutdown()
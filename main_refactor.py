@@ -1,15 +1,19 @@
 import os
+import json
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from niblit_core_refactor import niblitcore
-from modules.llm_adapter import LLMAdapter
+from modules.worker_pool import BoundedExecutor, Overloaded
+from modules.sessions import clean_session_id
 
-# --- Initialize Niblit core and LLM ---
+# --- Initialize Niblit core (it owns the long-lived LLM backend) ---
 core = niblitcore()
-llm = LLMAdapter(db=core.memory)
+
+# Blocking core/LLM calls run here, never on the event loop
+pool = BoundedExecutor()
 
 # --- FastAPI ---
 app = FastAPI(title="NiblitProV5 Web API", version="1.0")
@@ -24,12 +28,20 @@ app.add_middleware(
 # --- Health endpoint ---
 @app.get("/health")
 async def health():
+    llm = core.llm_backend()
     return {
         "status": "alive",
         "uptime_s": (core.current_time_seconds() if hasattr(core, "current_time_seconds") else 0),
-        "memory_entries": getattr(core.memory, "count", 0)
+        "memory_entries": getattr(core.memory, "count", 0),
+        "llm_cache": llm.cache_stats() if llm else {},
+        "sessions": core.sessions.stats(),
+        "workers": pool.stats()
     }
 
+def _session_id(request, data):
+    # per-client history in the core; anonymous callers share "default"
+    return clean_session_id(data.get("session_id") or request.headers.get("x-session-id"))
+
 # --- Query Niblit or LLM ---
 @app.post("/query")
 async def query(request: Request):
@@ -38,15 +50,52 @@ async def query(request: Request):
     use_llm = data.get("llm", True)
     context = data.get("context", [])
 
+    llm = core.llm_backend()
     try:
-        if use_llm and llm.is_available():
-            resp = llm.query(prompt, context)
+        if use_llm and llm and llm.is_available():
+            resp = await pool.run(llm.query, prompt, context)
         else:
-            resp = core.respond(prompt)
+            resp = await pool.run(core.respond, prompt, _session_id(request, data))
         return JSONResponse({"response": resp})
+    except Overloaded:
+        return JSONResponse({"error": "busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
 
+# --- Streaming query (Server-Sent Events) ---
+def _sse(make_chunks, *args):
+    # runs on a pool worker for the whole stream, LLM HTTP work included
+    try:
+        for tok in make_chunks(*args):
+            yield f"data: {json.dumps({'token': tok})}\n\n"
+    except Exception as e:
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+    yield "data: [DONE]\n\n"
+
+def _stream_chunks(prompt, context, use_llm, session_id):
+    llm = core.llm_backend()
+    if use_llm and llm and llm.is_available():
+        return llm.query(prompt, context, stream=True)
+    return iter([core.respond(prompt, session_id)])
+
+@app.post("/query/stream")
+async def query_stream(request: Request):
+    data = await request.json()
+    prompt = data.get("prompt", "")
+    use_llm = data.get("llm", True)
+    context = data.get("context", [])
+
+    try:
+        body = pool.stream(_sse, _stream_chunks, prompt, context, use_llm, _session_id(request, data))
+    except Overloaded:
+        return JSONResponse({"error": "busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+    return StreamingResponse(body, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.on_event("shutdown")
+def _stop_workers():
+    pool.shutdown()
+
 # --- Frontend placeholder ---
 @app.get("/")
 async def index():
@@ -0,0 +1,28 @@
+# modules/context_window.py
+"""Token budgeting for prompt context.
+
+approx_tokens() counts regex words/punctuation scaled to roughly match BPE
+tokenizers; it is meant for budgeting, not billing. trim_to_budget() keeps
+the newest items that fit a token budget. (niblit-core has its own copy
+with a running ContextWindow.)
+"""
+import re
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def approx_tokens(text):
+    words = _TOKEN.findall(text or "")
+    # a word up to 7 chars is one BPE piece; longer words add one per 8 chars
+    return sum(1 + len(w) // 8 for w in words)
+
+def trim_to_budget(items, budget, text=lambda it: it):
+    """Return the newest suffix of `items` whose text fits in `budget` tokens."""
+    kept, used = [], 0
+    for it in reversed(items):
+        n = approx_tokens(text(it))
+        if used + n > budget:
+            break
+        kept.append(it)
+        used += n
+    kept.reverse()
+    return kept
@@ -0,0 +1,112 @@
+# modules/event_bus.py
+"""Bounded in-process event bus with topic subscribers.
+
+emit() enqueues and returns immediately; a dispatch worker hands each event
+to the handlers subscribed to its topic (and to "*") as soon as it arrives.
+Events nobody subscribed to are kept in a bounded backlog for pull-style
+consumers (read_events()). The queue holds at most `max_queue` events
+(NIBLIT_EVENT_QUEUE, default 1024): when it is full, emit() waits up to
+`timeout` seconds and then drops the event, counting it in stats().
+"""
+import os, time, logging, threading
+from collections import deque
+
+log = logging.getLogger("event-bus")
+
+class EventBus:
+    def __init__(self, max_queue=None, backlog=256, name="niblit-events"):
+        self.max_queue = max_queue or int(os.getenv("NIBLIT_EVENT_QUEUE", "1024"))
+        self.name = name
+        self._queue = deque()            # (topic, payload, emitted_at)
+        self._backlog = deque(maxlen=backlog)
+        self._handlers = {}              # topic -> [handler, ...]
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._running = True
+        self._stats = {"emitted": 0, "dispatched": 0, "dropped": 0, "unhandled": 0,
+                       "handler_errors": 0, "max_latency_ms": 0.0}
+        self._worker = threading.Thread(target=self._run, daemon=True, name=name)
+        self._worker.start()
+
+    # subscribers
+    def subscribe(self, topic, handler):
+        """Call handler(topic, payload) for every `topic` event ("*" for all)."""
+        with self._lock:
+            # copy-on-write so the worker can iterate without holding the lock
+            self._handlers[topic] = self._handlers.get(topic, []) + [handler]
+        return handler
+
+    def unsubscribe(self, topic, handler):
+        with self._lock:
+            hs = [h for h in self._handlers.get(topic, []) if h is not handler]
+            if hs:
+                self._handlers[topic] = hs
+            else:
+                self._handlers.pop(topic, None)
+
+    # producers
+    def emit(self, topic, payload=None, timeout=0.0):
+        """Queue an event. Returns False if it was dropped because the queue stayed full."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while not self._running or len(self._queue) >= self.max_queue:
+                left = deadline - time.monotonic()
+                if left <= 0 or not self._running:
+                    self._stats["dropped"] += 1
+                    return False
+                self._not_full.wait(left)
+            self._queue.append((topic, payload, time.monotonic()))
+            self._stats["emitted"] += 1
+            self._not_empty.notify()
+        return True
+
+    # pull consumers
+    def read_events(self):
+        """Drain and return (topic, payload) events that had no subscriber."""
+        with self._lock:
+            out = list(self._backlog)
+            self._backlog.clear()
+        return out
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue and self._running:
+                    self._not_empty.wait()
+                if not self._queue:
+                    return
+                topic, payload, ts = self._queue.popleft()
+                self._not_full.notify()
+                handlers = self._handlers.get(topic, []) + self._handlers.get("*", [])
+                if not handlers:
+                    self._backlog.append((topic, payload))
+                    self._stats["unhandled"] += 1
+            for h in handlers:
+                try:
+                    h(topic, payload)
+                except Exception as e:
+                    log.debug("event handler %s failed on %s: %s", h, topic, e)
+                    with self._lock:
+                        self._stats["handler_errors"] += 1
+            with self._lock:
+                self._stats["dispatched"] += 1
+                latency = (time.monotonic() - ts) * 1000
+                if latency > self._stats["max_latency_ms"]:
+                    self._stats["max_latency_ms"] = round(latency, 2)
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["queue_depth"] = len(self._queue)
+            out["queue_limit"] = self.max_queue
+            out["backlog"] = len(self._backlog)
+        return out
+
+    def close(self, timeout=2.0):
+        """Stop accepting events, let the worker drain what is queued, then stop it."""
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        self._worker.join(timeout=timeout)
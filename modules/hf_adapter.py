@@ -1,5 +1,6 @@
 # modules/hf_adapter.py
-import os, requests, logging, time
+import os, logging, time
+from . import http_pool
 
 log = logging.getLogger("hf-adapter")
 
@@ -20,6 +21,6 @@ class HFAdapter:
         payload = {"inputs": inputs}
         if parameters:
             payload["parameters"] = parameters
-        r = requests.post(url, headers=headers, json=payload, timeout=timeout)
+        r = http_pool.post(url, headers=headers, json=payload, timeout=timeout)
         r.raise_for_status()
         return r.json()
\ No newline at end of file
@@ -0,0 +1,108 @@
+# modules/interaction_log.py
+"""Fixed-size interaction log with an on-disk archive.
+
+The newest `capacity` turns (NIBLIT_INTERACTIONS_MAX, default 500) live in
+a preallocated ring of __slots__ records, so memory stays flat however long
+the process runs. A turn pushed out of the ring is appended to a JSONL
+archive (NIBLIT_INTERACTIONS_ARCHIVE; empty disables it) and can still be
+read back with iter_archive() / iter_all().
+"""
+import os, json, time, threading
+
+class Interaction:
+    __slots__ = ("role", "text", "ts")
+
+    def __init__(self, role, text, ts=None):
+        self.role = role
+        self.text = text
+        self.ts = ts if ts is not None else time.time()
+
+    def as_dict(self):
+        return {"role": self.role, "text": self.text, "ts": self.ts}
+
+class InteractionLog:
+    def __init__(self, capacity=None, archive_path=None):
+        self.capacity = capacity or int(os.getenv("NIBLIT_INTERACTIONS_MAX", "500"))
+        if archive_path is None:
+            archive_path = os.getenv("NIBLIT_INTERACTIONS_ARCHIVE", "niblit_interactions.jsonl")
+        self.archive_path = archive_path or None
+        self._ring = [None] * self.capacity
+        self._start = 0   # index of the oldest record
+        self._count = 0
+        self._archived = 0
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def add(self, role, text, ts=None):
+        rec = Interaction(role, text, ts)
+        with self._lock:
+            if self._count < self.capacity:
+                self._ring[(self._start + self._count) % self.capacity] = rec
+                self._count += 1
+                return rec
+            old = self._ring[self._start]
+            self._ring[self._start] = rec
+            self._start = (self._start + 1) % self.capacity
+            self._spill(old)
+        return rec
+
+    def append(self, item):
+        """list-style append of a {"role", "text"} dict."""
+        return self.add(item.get("role", "user"), item.get("text", ""), item.get("ts"))
+
+    def _spill(self, rec):
+        if not self.archive_path:
+            return
+        try:
+            if self._fh is None:
+                self._fh = open(self.archive_path, "a", encoding="utf-8")
+            self._fh.write(json.dumps(rec.as_dict(), ensure_ascii=False) + "\n")
+            self._fh.flush()
+            self._archived += 1
+        except OSError:
+            pass
+
+    def _snapshot(self):
+        with self._lock:
+            return [self._ring[(self._start + i) % self.capacity] for i in range(self._count)]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """In-memory records, oldest first (a snapshot; safe while others append)."""
+        return iter(self._snapshot())
+
+    def recent(self, n=20):
+        """The newest `n` turns as dicts, oldest first (LLM context format)."""
+        recs = self._snapshot()
+        return [r.as_dict() for r in recs[-n:]] if n > 0 else []
+
+    def iter_archive(self):
+        """Archived turns from disk, oldest first."""
+        if not self.archive_path or not os.path.exists(self.archive_path):
+            return
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+        with open(self.archive_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def iter_all(self):
+        """Every turn, archived then in memory, oldest first, as dicts."""
+        yield from self.iter_archive()
+        for r in self._snapshot():
+            yield r.as_dict()
+
+    def stats(self):
+        return {"in_memory": self._count, "capacity": self.capacity, "archived": self._archived}
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
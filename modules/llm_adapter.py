@@ -1,13 +1,32 @@
 # modules/llm_adapter.py
 import os, time
 from .llm_module import OpenAIClient, HFClient
+from .response_cache import ResponseCache, make_key
+from .context_window import approx_tokens, trim_to_budget
+
+# token cap on the last 10 interactions sent with each query (newest first until full)
+CONTEXT_TOKENS = int(os.getenv("NIBLIT_CONTEXT_TOKENS", "1536"))
+
+class ProviderError(RuntimeError):
+    """No provider produced a reply (none configured, or every one failed)."""
+
+_UNSET = object()
+_shared_cache = _UNSET
+
+def shared_cache():
+    """Process-wide reply cache (None when NIBLIT_LLM_CACHE=off)."""
+    global _shared_cache
+    if _shared_cache is _UNSET:
+        _shared_cache = ResponseCache.from_env()
+    return _shared_cache
 
 class LLMAdapter:
-    def __init__(self, db=None):
+    def __init__(self, db=None, cache=_UNSET):
         # priority: OpenAI -> HF
         self.db = db
         self.openai = OpenAIClient()
         self.hf = HFClient()
+        self.cache = shared_cache() if cache is _UNSET else cache
         self._last_check = 0
         self._last_result = False
 
@@ -21,31 +40,85 @@ class LLMAdapter:
         self._last_result = ok
         return ok
 
-    def query(self, prompt, context=None, max_tokens=300):
-        # build messages
+    def _build_messages(self, prompt, context=None):
         messages = [{"role":"system","content":"You are Niblit, a helpful assistant."}]
         if context:
-            # context is list of interactions
-            for it in context[-10:]:
+            # context is list of interactions; keep the newest that fit the budget
+            budget = CONTEXT_TOKENS - approx_tokens(prompt)
+            for it in trim_to_budget(context[-10:], budget, text=lambda it: it.get('text', '')):
                 role = it.get('role', 'user')
                 messages.append({"role": role, "content": it.get('text','')})
         messages.append({"role":"user","content": prompt})
+        return messages
+
+    def recall(self, prompt):
+        """The stored fact most relevant to the prompt (BM25 via db.search_facts), or None."""
+        if self.db is not None and hasattr(self.db, "search_facts"):
+            facts = self.db.search_facts(prompt, 1)
+            if facts:
+                return f"I recall: {facts[0]['value']}"
+        return None
+
+    def fallback(self, prompt):
+        return self.recall(prompt) or f"(No LLM configured) Echo: {prompt[:200]}"
+
+    def _cache_key(self, messages, max_tokens):
+        # replies are keyed on whichever provider query() would try first
+        model = self.openai.model if self.openai.is_available() else self.hf.model
+        return make_key(model, messages, max_tokens)
 
-        # prefer OpenAI if available
-        if self.openai.is_available():
+    def cache_stats(self):
+        return self.cache.stats() if self.cache else {}
+
+    def query(self, prompt, context=None, max_tokens=300, stream=False, strict=False):
+        """Return the reply text, or with stream=True an iterator of tokens.
+
+        When no provider answers, the reply is fallback(); with strict=True
+        ProviderError is raised instead so callers can track backend health.
+        """
+        messages = self._build_messages(prompt, context)
+        key = self._cache_key(messages, max_tokens) if self.cache else None
+        cached = self.cache.get(key) if key else None
+        if stream:
+            if cached is not None:
+                return iter([cached])
+            return self._query_stream(prompt, messages, max_tokens, key)
+        if cached is not None:
+            return cached
+
+        # prefer OpenAI if available, then HF
+        errors = []
+        for client in (self.openai, self.hf):
+            if not client.is_available():
+                continue
             try:
-                return self.openai.query_chat(messages, max_tokens=max_tokens)
+                return self._store(key, client.query_chat(messages, max_tokens=max_tokens))
             except Exception as e:
-                # fallback to HF
-                pass
-        if self.hf.is_available():
+                errors.append(f"{type(client).__name__}: {e}")
+        if strict:
+            raise ProviderError("; ".join(errors) or "no LLM provider configured")
+        # fallback heuristic (not cached)
+        return self.fallback(prompt)
+
+    def _store(self, key, reply):
+        if key and reply:
+            self.cache.put(key, reply)
+        return reply
+
+    def _query_stream(self, prompt, messages, max_tokens, key=None):
+        # same provider order as query(); a provider that fails before its
+        # first token falls through to the next one
+        for client in (self.openai, self.hf):
+            if not client.is_available():
+                continue
+            parts = []
             try:
-                return self.hf.query_chat(messages, max_tokens=max_tokens)
-            except Exception as e:
-                pass
-        # fallback heuristic
-        if self.db:
-            facts = self.db.list_facts(10)
-            if facts:
-                return f"I recall: {facts[0]['value']}"
-        return f"(No LLM configured) Echo: {prompt[:200]}"
\ No newline at end of file
+                for tok in client.stream_chat(messages, max_tokens=max_tokens):
+                    parts.append(tok)
+                    yield tok
+                self._store(key, "".join(parts))
+                return
+            except Exception:
+                if parts:
+                    return
+        yield self.fallback(prompt)
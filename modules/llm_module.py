@@ -1,5 +1,23 @@
 # modules/llm_module.py
-import os, json, requests, time
+import os, json, time
+from . import http_pool
+
+def iter_chat_stream(resp):
+    """Yield content deltas from an OpenAI-style SSE chat-completions stream."""
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            choice = json.loads(data).get("choices", [{}])[0]
+        except (ValueError, IndexError, AttributeError):
+            continue
+        delta = choice.get("delta") or {}
+        text = delta.get("content") if isinstance(delta, dict) else None
+        if text:
+            yield text
 
 class HFClient:
     """Light wrapper for HuggingFace router chat completions (if you use it)."""
@@ -16,7 +34,7 @@ class HFClient:
             raise RuntimeError("No HF token")
         headers = {"Authorization": f"Bearer {self.api_key}"}
         payload = {"model": self.model, "messages": messages, "max_tokens": max_tokens}
-        r = requests.post(f"{self.base}/chat/completions", headers=headers, json=payload, timeout=15)
+        r = http_pool.post(f"{self.base}/chat/completions", headers=headers, json=payload, timeout=15)
         r.raise_for_status()
         js = r.json()
         choice = js.get("choices", [{}])[0]
@@ -25,6 +43,16 @@ class HFClient:
             return msg.get("content") or ""
         return str(msg)
 
+    def stream_chat(self, messages, max_tokens=300):
+        """Yield reply tokens as the router streams them."""
+        if not self.is_available():
+            raise RuntimeError("No HF token")
+        headers = {"Authorization": f"Bearer {self.api_key}", "Accept": "text/event-stream"}
+        payload = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "stream": True}
+        with http_pool.post(f"{self.base}/chat/completions", headers=headers, json=payload, timeout=15, stream=True) as r:
+            r.raise_for_status()
+            yield from iter_chat_stream(r)
+
 class OpenAIClient:
     """Compatibility wrapper around OpenAI-style chat completions via openai.com API."""
     def __init__(self, api_key=None, base_url=None, model=None):
@@ -40,9 +68,20 @@ class OpenAIClient:
             raise RuntimeError("No OpenAI key configured")
         headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
         body = {"model": self.model, "messages": messages, "max_tokens": max_tokens}
-        r = requests.post(f"{self.base}/chat/completions", headers=headers, json=body, timeout=15)
+        r = http_pool.post(f"{self.base}/chat/completions", headers=headers, json=body, timeout=15)
         r.raise_for_status()
         js = r.json()
         choice = js.get("choices", [{}])[0]
         msg = choice.get("message", {})
-        return msg.get("content", "") if isinstance(msg, dict) else str(msg)
\ No newline at end of file
+        return msg.get("content", "") if isinstance(msg, dict) else str(msg)
+
+    def stream_chat(self, messages, max_tokens=300):
+        """Yield reply tokens as the API streams them."""
+        if not self.is_available():
+            raise RuntimeError("No OpenAI key configured")
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json",
+                   "Accept": "text/event-stream"}
+        body = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "stream": True}
+        with http_pool.post(f"{self.base}/chat/completions", headers=headers, json=body, timeout=15, stream=True) as r:
+            r.raise_for_status()
+            yield from iter_chat_stream(r)
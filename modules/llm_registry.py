@@ -0,0 +1,72 @@
+# modules/llm_registry.py
+import threading, time, logging
+
+log = logging.getLogger("llm-registry")
+
+class LLMBackendRegistry:
+    """Named, lazily built, long-lived LLM backends.
+
+    A backend is created once by its factory and reused for every turn, so
+    its clients, availability cache and pooled connections stay warm. After
+    `max_failures` consecutive failed calls the instance is dropped and,
+    once `cooldown` seconds have passed, rebuilt on next use.
+    """
+    def __init__(self, max_failures=3, cooldown=30.0):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._factories = {}
+        self._instances = {}
+        self._failures = {}
+        self._dropped_at = {}
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name="default"):
+        with self._lock:
+            inst = self._instances.get(name)
+            if inst is not None:
+                return inst
+            if time.time() - self._dropped_at.get(name, 0) < self.cooldown:
+                return None
+            factory = self._factories.get(name)
+            if factory is None:
+                raise KeyError(f"no LLM backend registered as '{name}'")
+            try:
+                inst = factory()
+            except Exception as e:
+                log.debug("LLM backend %s failed to build: %s", name, e)
+                self._dropped_at[name] = time.time()
+                return None
+            self._instances[name] = inst
+            self._failures[name] = 0
+            return inst
+
+    def report(self, name="default", ok=True):
+        with self._lock:
+            if ok:
+                self._failures[name] = 0
+                return
+            self._failures[name] = self._failures.get(name, 0) + 1
+            if self._failures[name] >= self.max_failures and name in self._instances:
+                log.info("LLM backend %s unhealthy after %s failures; rebuilding later", name, self._failures[name])
+                del self._instances[name]
+                self._dropped_at[name] = time.time()
+
+    def warm_up(self, names=None):
+        """Build backends (and probe availability) ahead of the first turn."""
+        for name in names or list(self._factories):
+            inst = self.get(name)
+            if inst is not None and hasattr(inst, "is_available"):
+                try:
+                    inst.is_available()
+                except Exception:
+                    self.report(name, ok=False)
+
+    def status(self):
+        with self._lock:
+            return {n: {"loaded": n in self._instances, "failures": self._failures.get(n, 0)}
+                    for n in self._factories}
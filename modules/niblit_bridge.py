@@ -1,5 +1,5 @@
 # modules/niblit_bridge.py
-import logging, time
+import os, logging, time
 from importlib import import_module
 
 log = logging.getLogger("niblit-bridge")
@@ -22,21 +22,24 @@ class Bridge:
     def can_call(self):
         return (self.openai and self.openai.available()) or (self.hf and self.hf.available())
 
-    def send_to_llm(self, text, prefer="openai"):
-        """Return string reply or raise."""
+    def send_to_llm(self, text, prefer="openai", stream=False):
+        """Return string reply or raise. With stream=True, return an iterator of text chunks."""
         # Build a basic chat-like payload
         if prefer == "openai" and self.openai and self.openai.available():
             messages = [{"role":"system","content":"You are Niblit — concise assistant."},
                         {"role":"user","content": text}]
-            return self.openai.query(messages)
+            return self.openai.query(messages, stream=stream)
         # fallback HF (assume model name in HF_MODEL env)
         if self.hf and self.hf.available():
             model = os.getenv("HF_MODEL","gpt2")
             out = self.hf.query(model, text)
             # hf model outputs vary; try to extract cleanly
             if isinstance(out, dict) and "generated_text" in out:
-                return out["generated_text"]
-            if isinstance(out, list) and out:
-                return str(out[0])
-            return str(out)
-        raise RuntimeError("No LLM adapter available")
\ No newline at end of file
+                reply = out["generated_text"]
+            elif isinstance(out, list) and out:
+                reply = str(out[0])
+            else:
+                reply = str(out)
+            # the inference API has no token stream; hand back one chunk
+            return iter([reply]) if stream else reply
+        raise RuntimeError("No LLM adapter available")
@@ -1,5 +1,7 @@
 # modules/openai_adapter.py
-import os, json, time, logging, requests
+import os, json, time, logging
+from . import http_pool
+from .llm_module import iter_chat_stream
 
 log = logging.getLogger("openai-adapter")
 
@@ -14,12 +16,14 @@ class OpenAIAdapter:
     def available(self):
         return bool(self.key and 'api.openai' in self.endpoint or 'openai' in self.endpoint)
 
-    def query(self, messages, model="gpt-4o-mini", max_tokens=512, timeout=15):
+    def query(self, messages, model="gpt-4o-mini", max_tokens=512, timeout=15, stream=False):
         if not self.available():
             raise RuntimeError("OpenAIAdapter: missing api key or endpoint")
+        if stream:
+            return self._stream(messages, model, max_tokens, timeout)
         headers = {"Authorization": f"Bearer {self.key}", "Content-Type":"application/json"}
         payload = {"model": model, "messages": messages, "max_tokens": max_tokens}
-        r = requests.post(self.endpoint, headers=headers, json=payload, timeout=timeout)
+        r = http_pool.post(self.endpoint, headers=headers, json=payload, timeout=timeout)
         r.raise_for_status()
         jr = r.json()
         # Basic defensive extraction
@@ -27,4 +31,12 @@ class OpenAIAdapter:
         if isinstance(choice, dict):
             msg = choice.get("message",{}) or {}
             return msg.get("content", choice.get("text",""))
-        return str(jr)
\ No newline at end of file
+        return str(jr)
+
+    def _stream(self, messages, model, max_tokens, timeout):
+        headers = {"Authorization": f"Bearer {self.key}", "Content-Type":"application/json",
+                   "Accept": "text/event-stream"}
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "stream": True}
+        with http_pool.post(self.endpoint, headers=headers, json=payload, timeout=timeout, stream=True) as r:
+            r.raise_for_status()
+            yield from iter_chat_stream(r)
@@ -0,0 +1,100 @@
+# modules/response_cache.py
+"""Bounded LRU + TTL cache for LLM replies.
+
+Keys are a SHA-256 of the model, the normalized chat messages and
+max_tokens, so "How are you?" and "how are you" share an entry. An optional
+SQLite file adds a second, persistent tier that survives restarts; memory
+hits are promoted from it. Configure with env vars:
+
+  NIBLIT_LLM_CACHE        "off" disables caching            (default on)
+  NIBLIT_LLM_CACHE_SIZE   max in-memory entries             (default 512)
+  NIBLIT_LLM_CACHE_TTL    seconds an entry stays valid      (default 3600)
+  NIBLIT_LLM_CACHE_DB     path of the SQLite tier           (default: none)
+"""
+import os, re, json, time, sqlite3, hashlib, threading
+from collections import OrderedDict
+
+_WS = re.compile(r"\s+")
+
+def normalize_text(text):
+    return _WS.sub(" ", str(text or "")).strip().lower().rstrip("?!. ")
+
+def make_key(model, messages, max_tokens):
+    norm = [(m.get("role", "user"), normalize_text(m.get("content", ""))) for m in messages]
+    raw = json.dumps([model or "", norm, max_tokens], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    def __init__(self, max_entries=512, ttl=3600.0, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()  # key -> (expires_at, value)
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS llm_cache(key TEXT PRIMARY KEY, value TEXT, expires REAL)")
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        if os.getenv("NIBLIT_LLM_CACHE", "on").lower() in ("off", "0", "false"):
+            return None
+        return cls(max_entries=int(os.getenv("NIBLIT_LLM_CACHE_SIZE", "512")),
+                   ttl=float(os.getenv("NIBLIT_LLM_CACHE_TTL", "3600")),
+                   disk_path=os.getenv("NIBLIT_LLM_CACHE_DB") or None)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self._mem.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return item[1]
+                del self._mem[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value, expires FROM llm_cache WHERE key=?", (key,)).fetchone()
+                if row and row[1] > now:
+                    self._remember(key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires)
+            self._stats["stores"] += 1
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("INSERT OR REPLACE INTO llm_cache(key, value, expires) VALUES(?,?,?)",
+                                     (key, value, expires))
+                    if self._stats["stores"] % 100 == 0:
+                        self._db.execute("DELETE FROM llm_cache WHERE expires<=?", (time.time(),))
+
+    def _remember(self, key, value, expires):
+        self._mem[key] = (expires, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._mem)
+        lookups = out["hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return out
@@ -0,0 +1,171 @@
+# modules/scheduler.py
+"""One timer thread for all periodic background work.
+
+Modules register jobs instead of starting their own `while True: sleep()`
+threads:
+
+    job = default_scheduler().every(30, self.update, name="sensors", jitter=2)
+    ...
+    job.cancel()
+
+Due times live in a heap, so the timer thread sleeps exactly until the next
+job is due and wakes at once on register/cancel/shutdown. Jobs run on a
+small worker pool (NIBLIT_SCHEDULER_WORKERS, default 4), so one slow job (a
+network sync, say) neither stalls the timer nor holds up the others.
+Periodic jobs keep to their original grid (no drift from run time); ticks
+missed while a job was still running are skipped, never queued up. `jitter`
+adds 0..jitter seconds to each run so jobs with the same period do not fire
+together.
+"""
+import os, time, heapq, random, logging, itertools, threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("scheduler")
+
+class Job:
+    __slots__ = ("name", "fn", "interval", "jitter", "base", "due", "cancelled",
+                 "running", "runs", "errors", "_scheduler")
+
+    def __init__(self, scheduler, fn, interval, jitter, name):
+        self._scheduler = scheduler
+        self.fn = fn
+        self.interval = interval  # None for one-shot jobs
+        self.jitter = jitter
+        self.name = name or getattr(fn, "__name__", "job")
+        self.base = 0.0           # next slot on the job's grid, before jitter
+        self.due = 0.0            # when the timer will actually run it
+        self.cancelled = False
+        self.running = False
+        self.runs = 0
+        self.errors = 0
+
+    def cancel(self):
+        self._scheduler.cancel(self)
+
+    def trigger(self):
+        """Run as soon as possible, without moving the regular schedule."""
+        self._scheduler.trigger(self)
+
+class Scheduler:
+    def __init__(self, workers=None, name="niblit-scheduler"):
+        self.name = name
+        self.workers = workers or int(os.getenv("NIBLIT_SCHEDULER_WORKERS", "4"))
+        self._cond = threading.Condition()
+        self._heap = []  # (due, seq, job); stale entries are skipped
+        self._seq = itertools.count()
+        self._jobs = set()
+        self._pool = None
+        self._thread = None
+        self._running = True
+
+    # registration
+    def every(self, interval, fn, name=None, jitter=0.0, delay=None):
+        """Run fn() every `interval` seconds, first after `delay` (default: one interval)."""
+        job = Job(self, fn, float(interval), jitter, name)
+        job.base = time.monotonic() + (interval if delay is None else delay)
+        self._add(job, job.base + self._jitter(job))
+        return job
+
+    def call_later(self, delay, fn, name=None):
+        job = Job(self, fn, None, 0.0, name)
+        self._add(job, time.monotonic() + delay)
+        return job
+
+    def _add(self, job, due):
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("scheduler is shut down")
+            self._jobs.add(job)
+            self._push(job, due)
+            if self._thread is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name + "-job")
+                self._thread = threading.Thread(target=self._loop, daemon=True, name=self.name)
+                self._thread.start()
+
+    def _push(self, job, due):
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._cond.notify()
+
+    @staticmethod
+    def _jitter(job):
+        return random.uniform(0, job.jitter) if job.jitter else 0.0
+
+    def cancel(self, job):
+        with self._cond:
+            job.cancelled = True
+            self._jobs.discard(job)
+            self._cond.notify()
+
+    def trigger(self, job):
+        with self._cond:
+            if not job.cancelled and self._running:
+                self._push(job, time.monotonic())
+
+    # timer
+    def _loop(self):
+        with self._cond:
+            while self._running:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, job = self._heap[0]
+                if job.cancelled or due != job.due:
+                    heapq.heappop(self._heap)
+                    continue
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._heap)
+                if job.interval is not None:
+                    # next grid slot after now; slots missed while busy are skipped
+                    if job.base <= now:
+                        job.base += job.interval * (int((now - job.base) // job.interval) + 1)
+                    self._push(job, job.base + self._jitter(job))
+                else:
+                    self._jobs.discard(job)
+                if job.running:
+                    continue  # previous run still going; never overlap a job with itself
+                job.running = True
+                self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.fn()
+        except Exception as e:
+            job.errors += 1
+            log.debug("job %s failed: %s", job.name, e)
+        finally:
+            job.runs += 1
+            job.running = False
+
+    def jobs(self):
+        now = time.monotonic()
+        with self._cond:
+            return [{"name": j.name, "interval": j.interval, "runs": j.runs, "errors": j.errors,
+                     "running": j.running, "next_in": round(max(0.0, j.due - now), 2)}
+                    for j in sorted(self._jobs, key=lambda j: j.due)]
+
+    def shutdown(self, wait=False):
+        """Cancel every job and stop the timer; with `wait`, also wait for jobs already running."""
+        with self._cond:
+            self._running = False
+            for j in self._jobs:
+                j.cancelled = True
+            self._jobs.clear()
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_scheduler():
+    """Process-wide scheduler shared by the core and its modules."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Scheduler()
+        return _default
@@ -0,0 +1,96 @@
+# modules/sessions.py
+"""Per-client conversation state for multi-user cores.
+
+Each session id gets its own SessionState: a bounded history ring buffer,
+its own persona (tone, recent emotions, last message) and a lock, so
+concurrent users never share or corrupt each other's context. States are
+created on first use and kept in LRU order; the least recently used are
+evicted beyond `max_sessions` (NIBLIT_MAX_SESSIONS, default 1024) or after
+`idle_ttl` seconds without a request (NIBLIT_SESSION_TTL, default 3600).
+History keeps the last `history` turns (NIBLIT_SESSION_HISTORY, default 20).
+"""
+import os, re, time, uuid, threading
+from collections import OrderedDict, deque
+
+DEFAULT_SESSION = "default"
+_VALID_ID = re.compile(r"^[A-Za-z0-9_.:-]{1,64}$")
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+def clean_session_id(value):
+    """Return `value` if it is a usable session id, else None."""
+    value = (value or "").strip()
+    return value if _VALID_ID.match(value) else None
+
+class SessionState:
+    __slots__ = ("id", "history", "persona", "lock", "created", "last_seen", "turns")
+
+    def __init__(self, session_id, history=20, emotions=40, persona=None):
+        self.id = session_id
+        self.history = deque(maxlen=history)  # {"role", "text"} dicts, oldest first
+        base = dict(persona or {})
+        base["emotion_history"] = deque(maxlen=emotions)
+        base.setdefault("last_user", None)
+        self.persona = base
+        self.lock = threading.RLock()
+        self.created = self.last_seen = time.time()
+        self.turns = 0
+
+    def add(self, role, text):
+        self.history.append({"role": role, "text": text})
+        if role == "user":
+            self.turns += 1
+
+    def context(self):
+        return list(self.history)
+
+class SessionStore:
+    def __init__(self, max_sessions=None, idle_ttl=None, history=None, persona=None):
+        self.max_sessions = max_sessions or int(os.getenv("NIBLIT_MAX_SESSIONS", "1024"))
+        self.idle_ttl = idle_ttl if idle_ttl is not None else float(os.getenv("NIBLIT_SESSION_TTL", "3600"))
+        self.history = history or int(os.getenv("NIBLIT_SESSION_HISTORY", "20"))
+        self.persona = persona or {}  # template copied into every new session
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._evicted = 0
+
+    def get(self, session_id=None):
+        """Return the state for `session_id`, creating it on demand."""
+        sid = session_id or DEFAULT_SESSION
+        now = time.time()
+        with self._lock:
+            state = self._sessions.get(sid)
+            if state is None:
+                state = SessionState(sid, history=self.history, persona=self.persona)
+                self._sessions[sid] = state
+            else:
+                self._sessions.move_to_end(sid)
+            state.last_seen = now
+            self._evict(now)
+        return state
+
+    def _evict(self, now):
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._evicted += 1
+        if self.idle_ttl:
+            # LRU order: stop at the first session still within its ttl
+            while self._sessions:
+                sid, oldest = next(iter(self._sessions.items()))
+                if now - oldest.last_seen <= self.idle_ttl:
+                    break
+                del self._sessions[sid]
+                self._evicted += 1
+
+    def drop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {"active": len(self._sessions), "limit": self.max_sessions,
+                    "evicted": self._evicted, "idle_ttl": self.idle_ttl}
@@ -0,0 +1,176 @@
+# modules/status_feed.py
+"""Server-push status channel for dashboards.
+
+One StatusFeed per process holds the current status as a flat dict
+(health, personality, sensors, ...). Every key remembers the version in
+which it last changed, so a client that has seen version `v` gets exactly
+the keys that changed since `v`. Nothing is sent when nothing changed.
+
+Status comes from `sample()`, which runs on the shared scheduler every
+`interval` seconds (NIBLIT_STATUS_INTERVAL, default 2). The job only runs
+while someone is watching, and it runs once per interval however many
+clients there are. Producers can also push values with update().
+
+Consumers:
+    feed.subscribe(fn)              fn(delta) on every change (in-process UIs)
+    for chunk in feed.sse():        blocking SSE generator (Flask)
+    async for chunk in feed.sse_async():   SSE for ASGI StreamingResponse
+"""
+import os, json, asyncio, logging, threading
+from modules.scheduler import default_scheduler
+
+log = logging.getLogger("status-feed")
+
+def sse_event(data, event="status", event_id=None):
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class StatusFeed:
+    def __init__(self, sample=None, interval=None, keepalive=15.0, scheduler=None):
+        self.sample = sample
+        self.interval = interval or float(os.getenv("NIBLIT_STATUS_INTERVAL", "2"))
+        self.keepalive = keepalive
+        self._scheduler = scheduler
+        self._cond = threading.Condition()
+        self._state = {}
+        self._changed = {}       # key -> version of its last change
+        self.version = 0
+        self._listeners = []
+        self._async_waiters = set()  # (loop, asyncio.Event)
+        self._watchers = 0
+        self._job = None
+        self._pushes = 0
+
+    # producers
+    def update(self, values):
+        """Merge `values` into the state; returns the keys that actually changed."""
+        with self._cond:
+            delta = {k: v for k, v in values.items() if k not in self._state or self._state[k] != v}
+            if not delta:
+                return {}
+            self.version += 1
+            for k, v in delta.items():
+                self._state[k] = v
+                self._changed[k] = self.version
+            listeners = list(self._listeners)
+            waiters = list(self._async_waiters)
+            self._pushes += 1
+            self._cond.notify_all()
+        for loop, ev in waiters:
+            try:
+                loop.call_soon_threadsafe(ev.set)
+            except RuntimeError:
+                pass  # that loop has closed
+        for fn in listeners:
+            try:
+                fn(delta)
+            except Exception as e:
+                log.debug("status listener %s failed: %s", fn, e)
+        return delta
+
+    def refresh(self):
+        if self.sample is None:
+            return {}
+        try:
+            values = self.sample()
+        except Exception as e:
+            log.debug("status sample failed: %s", e)
+            return {}
+        return self.update(values or {})
+
+    # consumers
+    def snapshot(self):
+        with self._cond:
+            return self.version, dict(self._state)
+
+    def changes_since(self, version):
+        with self._cond:
+            return self.version, {k: self._state[k] for k, v in self._changed.items() if v > version}
+
+    def wait(self, version, timeout=None):
+        """Block until there are changes after `version`; returns (version, delta)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > version, timeout)
+        return self.changes_since(version)
+
+    async def wait_async(self, version, timeout=None):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            self._async_waiters.add(waiter)
+        try:
+            if self.version <= version:
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return self.changes_since(version)
+
+    def subscribe(self, fn):
+        with self._cond:
+            self._listeners = self._listeners + [fn]
+        self._watch(1)
+        return fn
+
+    def unsubscribe(self, fn):
+        with self._cond:
+            self._listeners = [f for f in self._listeners if f != fn]
+        self._watch(-1)
+
+    # streams: a full snapshot first, then only deltas; comment lines keep proxies open
+    def sse(self, since=None):
+        self._watch(1)
+        try:
+            version, data = self._opening(since)
+            if data or since is None:
+                yield sse_event(data, event_id=version)
+            while True:
+                new, delta = self.wait(version, self.keepalive)
+                if delta:
+                    version = new
+                    yield sse_event(delta, event_id=version)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            self._watch(-1)
+
+    async def sse_async(self, since=None):
+        self._watch(1)
+        try:
+            version, data = self._opening(since)
+            if data or since is None:
+                yield sse_event(data, event_id=version)
+            while True:
+                new, delta = await self.wait_async(version, self.keepalive)
+                if delta:
+                    version = new
+                    yield sse_event(delta, event_id=version)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            self._watch(-1)
+
+    def _opening(self, since):
+        if self.version == 0:
+            self.refresh()  # first watcher: do not make it wait a whole interval
+        if since is not None and 0 < since <= self.version:
+            return self.changes_since(since)  # reconnect with Last-Event-ID
+        return self.snapshot()
+
+    # sampling runs only while somebody watches
+    def _watch(self, step):
+        with self._cond:
+            self._watchers += step
+            if self._watchers > 0 and self._job is None and self.sample is not None:
+                sched = self._scheduler or default_scheduler()
+                self._job = sched.every(self.interval, self.refresh, name="status-feed", delay=0)
+            elif self._watchers <= 0 and self._job is not None:
+                self._job.cancel()
+                self._job = None
+
+    def stats(self):
+        with self._cond:
+            return {"version": self.version, "watchers": self._watchers,
+                    "sampling": self._job is not None, "pushes": self._pushes}
@@ -0,0 +1,97 @@
+# context_window.py
+"""Token-budgeted chat context.
+
+ContextWindow keeps a running list of turns with their token counts, so
+adding a turn costs one tokenizer pass over that turn only. When the total
+goes over `budget`, the oldest turns are evicted into a short extractive
+summary (first words of each turn), which is itself capped at
+`summary_budget` tokens. Token counts come from approx_tokens(), a regex
+word/punctuation count scaled to roughly match BPE tokenizers; it is
+meant for budgeting, not billing.
+"""
+import re
+from collections import deque
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def approx_tokens(text):
+    words = _TOKEN.findall(text or "")
+    # a word up to 7 chars is one BPE piece; longer words add one per 8 chars
+    return sum(1 + len(w) // 8 for w in words)
+
+def trim_to_budget(items, budget, text=lambda it: it):
+    """Return the newest suffix of `items` whose text fits in `budget` tokens."""
+    kept, used = [], 0
+    for it in reversed(items):
+        n = approx_tokens(text(it))
+        if used + n > budget:
+            break
+        kept.append(it)
+        used += n
+    kept.reverse()
+    return kept
+
+def _gist(text, words=12):
+    parts = (text or "").split()
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
+class ContextWindow:
+    def __init__(self, budget=1024, summary_budget=128):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self._turns = deque()    # (role, text, tokens)
+        self._summary = deque()  # (line, tokens)
+        self._tokens = 0
+        self._summary_tokens = 0
+        self.evicted = 0
+
+    @property
+    def tokens(self):
+        return self._tokens + self._summary_tokens
+
+    def __len__(self):
+        return len(self._turns)
+
+    def add(self, role, text):
+        n = approx_tokens(text)
+        self._turns.append((role, text, n))
+        self._tokens += n
+        # always keep the newest turn, even if it alone is over budget
+        while self._tokens > self.budget and len(self._turns) > 1:
+            self._evict()
+
+    def extend(self, turns):
+        for role, text in turns:
+            self.add(role, text)
+
+    def _evict(self):
+        role, text, n = self._turns.popleft()
+        self._tokens -= n
+        self.evicted += 1
+        line = f"{role}: {_gist(text)}"
+        ln = approx_tokens(line)
+        self._summary.append((line, ln))
+        self._summary_tokens += ln
+        while self._summary_tokens > self.summary_budget and self._summary:
+            _, dropped = self._summary.popleft()
+            self._summary_tokens -= dropped
+
+    def clear(self):
+        self._turns.clear()
+        self._summary.clear()
+        self._tokens = self._summary_tokens = 0
+        self.evicted = 0
+
+    def turns(self):
+        return [(role, text) for role, text, _ in self._turns]
+
+    def summary(self):
+        return "\n".join(line for line, _ in self._summary)
+
+    def render(self, fmt="{ROLE}: {text}"):
+        lines = []
+        if self._summary:
+            lines.append("EARLIER (summarized):")
+            lines.extend(line for line, _ in self._summary)
+        lines.extend(fmt.format(ROLE=role.upper(), role=role, text=text) for role, text, _ in self._turns)
+        return "\n".join(lines)
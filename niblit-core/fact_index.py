@@ -0,0 +1,95 @@
+# fact_index.py
+"""In-memory BM25 index over stored facts.
+
+Facts are indexed by an integer id (the storage row id) on their key and
+value text; add() and remove() update the postings in place, so stores can
+keep the index current as facts are written instead of rebuilding it.
+search() returns the best-scoring facts for a free-text query, most
+relevant first; facts sharing no term with the query are never returned.
+"""
+import re
+import math
+import threading
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does did for from has have how i if in into is it its me my "
+    "of on or our so that the their them then there these they this to was we were what when "
+    "where which who why will with you your".split())
+
+def tokenize(text):
+    # keys like "favourite_colour" split on the underscore
+    return [w for w in _WORD.findall(str(text or "").lower()) if w not in STOPWORDS]
+
+class FactIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings = {}  # term -> {doc_id: term frequency}
+        self._lengths = {}   # doc_id -> token count
+        self._terms = {}     # doc_id -> distinct terms, for cheap removal
+        self._docs = {}      # doc_id -> fact as stored
+        self._total = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._docs
+
+    def add(self, doc_id, key, value, fact=None):
+        toks = tokenize(key) + tokenize(value)
+        with self._lock:
+            if doc_id in self._docs:
+                self._remove(doc_id)
+            self._docs[doc_id] = fact if fact is not None else (key, value)
+            self._lengths[doc_id] = len(toks)
+            self._terms[doc_id] = set(toks)
+            self._total += len(toks)
+            for t in toks:
+                posting = self._postings.setdefault(t, {})
+                posting[doc_id] = posting.get(doc_id, 0) + 1
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        if doc_id not in self._docs:
+            return
+        del self._docs[doc_id]
+        self._total -= self._lengths.pop(doc_id)
+        for t in self._terms.pop(doc_id):
+            del self._postings[t][doc_id]
+            if not self._postings[t]:
+                del self._postings[t]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._terms.clear()
+            self._docs.clear()
+            self._total = 0
+
+    def search(self, query, limit=5):
+        """Return up to `limit` (doc_id, score, fact) tuples, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return []
+            avg = self._total / n or 1.0
+            scores = {}
+            for t in terms:
+                posting = self._postings.get(t)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            # newer facts (higher ids) win ties
+            best = sorted(scores.items(), key=lambda kv: (kv[1], kv[0]), reverse=True)[:limit]
+            return [(doc_id, score, self._docs[doc_id]) for doc_id, score in best]
@@ -2,58 +2,248 @@
 import sqlite3
 import json
 import time
+import threading
+import queue
+from contextlib import contextmanager
 from typing import List, Tuple
 
+from fact_index import FactIndex
+
 DB_FILE = "niblit_memory.db"
 
+# Schema migrations, applied in order; PRAGMA user_version records how many ran.
+MIGRATIONS = [
+    [
+        """CREATE TABLE IF NOT EXISTS facts(
+                id INTEGER PRIMARY KEY,
+                key TEXT,
+                value TEXT,
+                tags TEXT,
+                ts INTEGER
+            )""",
+        """CREATE TABLE IF NOT EXISTS history(
+                id INTEGER PRIMARY KEY,
+                session TEXT,
+                role TEXT,
+                content TEXT,
+                ts INTEGER
+            )""",
+    ],
+    [
+        "CREATE INDEX IF NOT EXISTS idx_history_session_ts ON history(session, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_facts_key ON facts(key)",
+        "CREATE INDEX IF NOT EXISTS idx_facts_ts ON facts(ts)",
+    ],
+]
+
+class _WriteJob:
+    __slots__ = ("stmts", "facts", "done", "error")
+
+    def __init__(self, stmts, facts=False):
+        self.stmts = stmts
+        self.facts = facts  # changes the facts table: bump facts_generation on commit
+        self.done = threading.Event()
+        self.error = None
+
 class MemoryStore:
+    """SQLite-backed facts and chat history, safe to share across threads.
+
+    Each thread reads through its own connection (WAL lets them run in
+    parallel), while every write goes through a queue to one writer thread
+    that owns the only write connection. Writes queued together are
+    committed as one group; callers block until their write is durable, so
+    a thread always reads its own writes.
+    """
     def __init__(self, db_path=DB_FILE):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.db_path = db_path
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.facts_generation = 0  # bumped after each committed fact change, for callers caching facts
+        self._fact_index = FactIndex()
+        self._index_lock = threading.Lock()
+        self._indexed = (-1, 0)  # (facts_generation, highest fact id) the index reflects
+        self._queue: "queue.Queue[_WriteJob]" = queue.Queue()
+        self._closed = False
+        self._submit_lock = threading.Lock()  # orders submits against close()
+        self._writer_conn = self._connect(check_same_thread=False)
+        self._writer_conn.execute("PRAGMA journal_mode=WAL")
         self._init_tables()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="memorystore-writer")
+        self._writer.start()
+
+    def _connect(self, check_same_thread=True):
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
 
     def _init_tables(self):
-        c = self.conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS facts(
-                        id INTEGER PRIMARY KEY,
-                        key TEXT,
-                        value TEXT,
-                        tags TEXT,
-                        ts INTEGER
-                    )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS history(
-                        id INTEGER PRIMARY KEY,
-                        session TEXT,
-                        role TEXT,
-                        content TEXT,
-                        ts INTEGER
-                    )""")
-        self.conn.commit()
+        conn = self._writer_conn
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for i, stmts in enumerate(MIGRATIONS[version:], start=version + 1):
+            with conn:
+                for stmt in stmts:
+                    conn.execute(stmt)
+                conn.execute(f"PRAGMA user_version = {i}")
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # closed by close(), which may run on another thread
+            conn = self._local.conn = self._connect(check_same_thread=False)
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _writer_loop(self):
+        conn = self._writer_conn
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            jobs = [job]
+            # group commit: take whatever else is already waiting
+            while len(jobs) < 64:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._queue.put(None)
+                    break
+                jobs.append(nxt)
+            try:
+                with conn:
+                    for j in jobs:
+                        for sql, params in j.stmts:
+                            conn.execute(sql, params)
+            except Exception:
+                # one bad job must not sink its neighbours: retry individually
+                for j in jobs:
+                    try:
+                        with conn:
+                            for sql, params in j.stmts:
+                                conn.execute(sql, params)
+                    except Exception as e:
+                        j.error = e
+            if any(j.facts and j.error is None for j in jobs):
+                self.facts_generation += 1
+            for j in jobs:
+                j.done.set()
+
+    def _submit(self, stmts, facts=False):
+        job = _WriteJob(stmts, facts)
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("MemoryStore is closed")
+            self._queue.put(job)  # always ahead of close()'s stop marker
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+
+    def close(self, timeout=5):
+        """Drain queued writes, stop the writer and close every connection.
+
+        Returns False if the writer was still busy after `timeout` seconds;
+        its connection is then left open for it to finish on.
+        """
+        with self._submit_lock:
+            if self._closed:
+                return not self._writer.is_alive()
+            self._closed = True
+            self._queue.put(None)
+        self._writer.join(timeout=timeout)
+        stopped = not self._writer.is_alive()
+        if stopped:
+            self._writer_conn.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._readers.clear()
+        return stopped
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    @contextmanager
+    def batch(self):
+        """Group writes into one transaction.
+
+        Writes issued inside the block are queued and committed together when
+        the outermost block exits; they are dropped if it raises. Reads inside
+        the block do not see the queued writes.
+        """
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            yield self
+            return
+        self._local.pending = []
+        self._local.pending_facts = False
+        try:
+            yield self
+            queued, facts = self._local.pending, self._local.pending_facts
+        finally:
+            self._local.pending = None
+        if queued:
+            self._submit(queued, facts)
+
+    def _write(self, sql: str, params: tuple, facts=False):
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append((sql, params))
+            self._local.pending_facts = self._local.pending_facts or facts
+            return
+        self._submit([(sql, params)], facts)
 
     def add_fact(self, key: str, value: str, tags: List[str]=None):
         tags = json.dumps(tags or [])
         ts = int(time.time())
-        c = self.conn.cursor()
-        c.execute("INSERT INTO facts(key,value,tags,ts) VALUES(?,?,?,?)", (key, value, tags, ts))
-        self.conn.commit()
+        self._write("INSERT INTO facts(key,value,tags,ts) VALUES(?,?,?,?)", (key, value, tags, ts), facts=True)
 
+    def forget_fact(self, key):
+        self._write("DELETE FROM facts WHERE key = ?", (key,), facts=True)
+
+    def add_message(self, session: str, role: str, content: str):
+        ts = int(time.time())
+        self._write("INSERT INTO history(session,role,content,ts) VALUES(?,?,?,?)", (session,role,content,ts))
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
     def get_facts(self, limit=50) -> List[Tuple]:
-        c = self.conn.cursor()
+        c = self._reader().cursor()
         c.execute("SELECT key,value,tags,ts FROM facts ORDER BY ts DESC LIMIT ?", (limit,))
         return c.fetchall()
 
-    def forget_fact(self, key):
-        c = self.conn.cursor()
-        c.execute("DELETE FROM facts WHERE key = ?", (key,))
-        self.conn.commit()
+    def search_facts(self, query: str, limit=5) -> List[Tuple]:
+        """Facts ranked by BM25 relevance to `query`, as (key,value,tags,ts) rows."""
+        self._sync_fact_index()
+        return [fact for _, _, fact in self._fact_index.search(query, limit)]
 
-    def add_message(self, session: str, role: str, content: str):
-        ts = int(time.time())
-        c = self.conn.cursor()
-        c.execute("INSERT INTO history(session,role,content,ts) VALUES(?,?,?,?)", (session,role,content,ts))
-        self.conn.commit()
+    def _sync_fact_index(self):
+        # new rows are appended incrementally; a delete (row count no longer
+        # adds up) forces a rebuild, which is rare
+        gen = self.facts_generation
+        with self._index_lock:
+            seen_gen, max_id = self._indexed
+            if gen == seen_gen:
+                return
+            c = self._reader().cursor()
+            count = c.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+            rows = c.execute("SELECT id,key,value,tags,ts FROM facts WHERE id > ? ORDER BY id", (max_id,)).fetchall()
+            if count != len(self._fact_index) + len(rows):
+                self._fact_index.clear()
+                rows = c.execute("SELECT id,key,value,tags,ts FROM facts ORDER BY id").fetchall()
+            for fid, key, value, tags, ts in rows:
+                self._fact_index.add(fid, key, value, (key, value, tags, ts))
+                max_id = fid
+            self._indexed = (gen, max_id)
 
     def get_recent_history(self, session: str, limit=20) -> List[Tuple]:
-        c = self.conn.cursor()
-        c.execute("SELECT role,content,ts FROM history WHERE session=? ORDER BY ts DESC LIMIT ?", (session, limit))
+        c = self._reader().cursor()
+        c.execute("SELECT role,content,ts FROM history WHERE session=? ORDER BY ts DESC, id DESC LIMIT ?", (session, limit))
         rows = c.fetchall()
-        return list(reversed(rows))  # return oldest->newest
\ No newline at end of file
+        return list(reversed(rows))  # return oldest->newest
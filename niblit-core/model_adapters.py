@@ -0,0 +1,323 @@
+# model_adapters.py
+import os
+import subprocess
+import json
+import time
+import queue
+import socket
+import atexit
+import threading
+import urllib.request
+
+# Adapter interface: implement .generate(prompt: str, max_tokens=256) -> str
+# Adapters that can run several prompts at once set supports_batch and
+# override generate_batch; MicroBatcher then groups concurrent calls for them.
+
+class BaseAdapter:
+    supports_batch = False
+
+    def generate(self, prompt: str, max_tokens=256, stream=False):
+        raise NotImplementedError
+
+    def generate_batch(self, prompts, max_tokens=256):
+        return [self.generate(p, max_tokens=max_tokens) for p in prompts]
+
+class _PendingPrompt:
+    __slots__ = ("prompt", "max_tokens", "done", "result", "error")
+
+    def __init__(self, prompt, max_tokens):
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher(BaseAdapter):
+    """
+    Front an adapter with a micro-batching scheduler.
+    Concurrent generate() calls (e.g. several sessions sharing one local
+    model) are collected for up to `max_wait` seconds or until `max_batch_size`
+    prompts are waiting, then dispatched as one generate_batch call. Prompts
+    with different max_tokens go in separate batches. Adapters without
+    batch support, and streaming calls, pass straight through.
+    """
+    def __init__(self, adapter, max_batch_size=None, max_wait=None):
+        self.adapter = adapter
+        self.max_batch_size = max_batch_size or int(os.environ.get("NIBLIT_BATCH_MAX", "8"))
+        self.max_wait = max_wait if max_wait is not None else float(os.environ.get("NIBLIT_BATCH_WAIT_MS", "20")) / 1000.0
+        self.supports_batch = adapter.supports_batch
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.prompts = 0
+
+    def generate(self, prompt, max_tokens=256, stream=False):
+        if stream or not self.adapter.supports_batch:
+            return self.adapter.generate(prompt, max_tokens=max_tokens, stream=stream)
+        item = _PendingPrompt(prompt, max_tokens)
+        self._queue.put(item)
+        self._ensure_worker()
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def generate_batch(self, prompts, max_tokens=256):
+        return self.adapter.generate_batch(prompts, max_tokens=max_tokens)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, daemon=True, name="micro-batcher")
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            groups = {}
+            for item in batch:
+                groups.setdefault(item.max_tokens, []).append(item)
+            for max_tokens, items in groups.items():
+                self._dispatch(items, max_tokens)
+
+    def _dispatch(self, items, max_tokens):
+        self.batches += 1
+        self.prompts += len(items)
+        try:
+            results = self.adapter.generate_batch([i.prompt for i in items], max_tokens=max_tokens)
+            for item, res in zip(items, results):
+                item.result = res
+        except Exception as e:
+            for item in items:
+                item.error = e
+        for item in items:
+            item.done.set()
+
+class EchoAdapter(BaseAdapter):
+    """Fallback adapter for testing: returns a simple echo + small logic"""
+    def generate(self, prompt, max_tokens=256, stream=False):
+        # very simple "intelligent" fallback
+        if "what is" in prompt.lower():
+            return "I don't have an LLM backend configured. This is a fallback answer. Try installing a local model or enabling an API adapter."
+        return "Niblit (fallback): " + (prompt[:max_tokens])
+
+class OpenAIAdapter(BaseAdapter):
+    def __init__(self, api_key=None, model="gpt-3.5-turbo"):
+        try:
+            import openai
+        except ImportError:
+            raise RuntimeError("openai package not installed. pip install openai")
+        self.openai = openai
+        if api_key:
+            self.openai.api_key = api_key
+        self.model = model
+
+    def generate(self, prompt, max_tokens=256, stream=False):
+        # simple single-turn call
+        resp = self.openai.ChatCompletion.create(
+            model=self.model,
+            messages=[{"role":"system","content":"You are Niblit."},
+                      {"role":"user","content":prompt}],
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return resp.choices[0].message.content.strip()
+
+class LlamaCppAdapter(BaseAdapter):
+    """
+    Adapter that calls a local `llama.cpp`-style binary.
+    Requires you to have a llama.cpp or compatible binary that accepts stdin or args.
+    Configure binary path and model path externally.
+
+    By default every prompt spawns the binary, which reloads the model
+    weights each time. Pass `server_binary` (llama.cpp's `llama-server`) to
+    run in persistent mode instead: one long-lived server process keeps the
+    model loaded, prompts are fed to it over its local HTTP API through a
+    FIFO request queue, and `generate(..., stream=True)` yields tokens as
+    they are produced. The server is started on first use and restarted if
+    it dies.
+    """
+    def __init__(self, binary_path="llama.cpp/llama", model_path=None, args=None,
+                 server_binary=None, host="127.0.0.1", port=0, server_args=None,
+                 startup_timeout=300, request_timeout=600, parallel=1):
+        self.binary_path = binary_path
+        self.model_path = model_path
+        self.args = args or []
+        self.server_binary = server_binary
+        self.host = host
+        self.port = port
+        self.server_args = server_args or []
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        # server slots decoded together; >1 lets generate_batch run prompts side by side
+        self.parallel = parallel
+        self._proc = None
+        self._proc_lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._worker = None
+        if self.persistent:
+            atexit.register(self.close)
+
+    @property
+    def persistent(self):
+        return bool(self.server_binary)
+
+    @property
+    def supports_batch(self):
+        return self.persistent and self.parallel > 1
+
+    def generate_batch(self, prompts, max_tokens=256):
+        if not self.supports_batch:
+            return super().generate_batch(prompts, max_tokens=max_tokens)
+        if not self.model_path:
+            raise RuntimeError("LlamaCppAdapter requires model_path to be set.")
+        results = []
+        for i in range(0, len(prompts), self.parallel):
+            streams = self._submit_many(prompts[i:i + self.parallel], max_tokens)
+            results.extend("".join(tokens) for tokens in streams)
+        return results
+
+    def generate(self, prompt, max_tokens=256, stream=False):
+        if not self.model_path:
+            raise RuntimeError("LlamaCppAdapter requires model_path to be set.")
+        if self.persistent:
+            tokens = self._submit(prompt, max_tokens)
+            return tokens if stream else "".join(tokens)
+        # This is a generic example calling llama.cpp's `main` that accepts -m model -p prompt
+        cmd = [self.binary_path, "-m", self.model_path, "-p", prompt, "-n", str(max_tokens)] + self.args
+        try:
+            out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, universal_newlines=True, timeout=120)
+        except subprocess.CalledProcessError as e:
+            out = f"Error calling local model: {e.output}"
+        except Exception as e:
+            out = f"Failed to call local model: {e}"
+        return iter([out]) if stream else out
+
+    # ---------------------------
+    # Persistent server mode
+    # ---------------------------
+    def _submit(self, prompt, max_tokens):
+        """Queue a prompt; return an iterator over its tokens."""
+        return self._submit_many([prompt], max_tokens)[0]
+
+    def _submit_many(self, prompts, max_tokens):
+        """Queue prompts as one job (run concurrently on the server's slots)."""
+        outs = [queue.Queue() for _ in prompts]
+        self._jobs.put((prompts, max_tokens, outs))
+        if self._worker is None or not self._worker.is_alive():
+            with self._proc_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._work, daemon=True, name="llama-queue")
+                    self._worker.start()
+        return [self._drain(out) for out in outs]
+
+    @staticmethod
+    def _drain(out):
+        while True:
+            kind, value = out.get()
+            if kind == "tok":
+                yield value
+            elif kind == "err":
+                yield f"Failed to call local model: {value}"
+                return
+            else:
+                return
+
+    def _work(self):
+        # one job at a time, in arrival order: the model process is the
+        # bottleneck, so this keeps callers from thrashing it. A batched job's
+        # prompts are sent together so the server decodes them in parallel.
+        while True:
+            prompts, max_tokens, outs = self._jobs.get()
+            try:
+                self._ensure_server()
+            except Exception as e:
+                for out in outs:
+                    out.put(("err", e))
+                continue
+            if len(prompts) == 1:
+                self._run_one(prompts[0], max_tokens, outs[0])
+                continue
+            threads = [threading.Thread(target=self._run_one, args=(p, max_tokens, o), daemon=True)
+                       for p, o in zip(prompts, outs)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+    def _run_one(self, prompt, max_tokens, out):
+        try:
+            for tok in self._stream_completion(prompt, max_tokens):
+                out.put(("tok", tok))
+            out.put(("end", None))
+        except Exception as e:
+            out.put(("err", e))
+
+    def _url(self, path):
+        return f"http://{self.host}:{self.port}{path}"
+
+    def _ensure_server(self):
+        with self._proc_lock:
+            if self._proc is not None and self._proc.poll() is None:
+                return
+            if not self.port:
+                with socket.socket() as s:
+                    s.bind((self.host, 0))
+                    self.port = s.getsockname()[1]
+            cmd = [self.server_binary, "-m", self.model_path, "--host", self.host,
+                   "--port", str(self.port)] + self.server_args
+            if self.parallel > 1:
+                cmd += ["--parallel", str(self.parallel)]
+            self._proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            deadline = time.time() + self.startup_timeout
+            while time.time() < deadline:
+                if self._proc.poll() is not None:
+                    raise RuntimeError(f"llama server exited with code {self._proc.returncode}")
+                try:
+                    with urllib.request.urlopen(self._url("/health"), timeout=2) as r:
+                        if r.status == 200:
+                            return
+                except Exception:
+                    pass
+                time.sleep(0.5)
+            self.close()
+            raise RuntimeError("llama server did not become ready in time")
+
+    def _stream_completion(self, prompt, max_tokens):
+        body = json.dumps({"prompt": prompt, "n_predict": max_tokens, "stream": True}).encode("utf-8")
+        req = urllib.request.Request(self._url("/completion"), data=body,
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.request_timeout) as r:
+            for raw in r:
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    chunk = json.loads(line[len("data:"):].strip())
+                except ValueError:
+                    continue
+                if chunk.get("content"):
+                    yield chunk["content"]
+                if chunk.get("stop"):
+                    break
+
+    def close(self):
+        with self._proc_lock:
+            proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
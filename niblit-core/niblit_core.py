@@ -2,42 +2,91 @@
 from prompts import SYSTEM_PROMPT, DEFAULT_BEHAVIOR
 from memory import MemoryStore
 from model_adapters import EchoAdapter, OpenAIAdapter, LlamaCppAdapter
+from context_window import ContextWindow, approx_tokens
+import os
 import time
 import json
 
+# prompt token budget (system prompt + facts + history); roughly a quarter
+# goes to facts and the rest to the running conversation window
+CONTEXT_TOKENS = int(os.environ.get("NIBLIT_CONTEXT_TOKENS", "2048"))
+FACTS_PER_PROMPT = int(os.environ.get("NIBLIT_FACTS_PER_PROMPT", "5"))
+
 class NiblitCore:
-    def __init__(self, adapter=None, session_id="default"):
-        self.mem = MemoryStore()
+    def __init__(self, adapter=None, session_id="default", mem=None):
+        # pass one shared MemoryStore to serve many sessions from one process
+        self.mem = mem or MemoryStore()
         self.session = session_id
         self.adapter = adapter or EchoAdapter()
         self.system_prompt = SYSTEM_PROMPT
         self.behavior = DEFAULT_BEHAVIOR.copy()
         self.short_window = []  # short-term messages (tuples role, text)
+        budget = max(256, CONTEXT_TOKENS - approx_tokens(self.system_prompt) - 64)
+        self.facts_budget = budget // 4
+        self.window = ContextWindow(budget=budget - self.facts_budget, summary_budget=budget // 8)
+        self._window_loaded = False
+
+    def _load_window(self):
+        # seed once from stored history; afterwards turns are added as they happen
+        if not self._window_loaded:
+            history = self.mem.get_recent_history(self.session, limit=50)
+            self.window.extend((r, c) for (r, c, _) in history)
+            self._window_loaded = True
+
+    def _facts_text(self, query):
+        # only the facts relevant to this message, within the facts budget
+        lines, used = [], 0
+        for (k, v, _, _) in self.mem.search_facts(query, limit=FACTS_PER_PROMPT):
+            line = f"{k}: {v}"
+            used += approx_tokens(line)
+            if used > self.facts_budget:
+                break
+            lines.append(line)
+        return "\n".join(lines)
 
     def _build_prompt(self, user_message: str):
-        # Retrieve top facts (simple) and recent history
-        facts = self.mem.get_facts(limit=10)
-        facts_text = "\n".join([f"{k}: {v}" for (k,v,_,_) in facts]) if facts else ""
-        history = self.mem.get_recent_history(self.session, limit=8)
-        history_text = "\n".join([f"{r.upper()}: {c}" for (r,c,_) in history])
+        # history comes from the running window, which already holds this
+        # user message
+        self._load_window()
         behavior_json = json.dumps(self.behavior)
         prompt = "\n".join([
             self.system_prompt,
             f"BEHAVIOR: {behavior_json}",
             "RETRIEVED_FACTS:",
-            facts_text,
+            self._facts_text(user_message),
             "RECENT_HISTORY:",
-            history_text,
-            "USER:",
-            user_message,
+            self.window.render(),
             "",
             "REPLY:"
         ])
         return prompt
 
     def ingest_user_message(self, text: str):
+        # the user message and any fact change commit together before the
+        # model runs, so a failed or interrupted generation never loses them
+        with self.mem.batch():
+            reply = self._record_user_turn(text)
+        if reply is not None:
+            return reply
+
+        # normal flow
+        prompt = self._build_prompt(text)
+        resp = self.adapter.generate(prompt, max_tokens=512)
+        self.mem.add_message(self.session, "assistant", resp)  # the reply commits on its own
+        self.window.add("assistant", resp)
+        # simple adaptive behavior: if user says "be more concise" update behavior
+        if "be more concise" in text.lower():
+            self.behavior["verbosity"] = "low"
+        if "be more detailed" in text.lower():
+            self.behavior["verbosity"] = "high"
+        return resp
+
+    def _record_user_turn(self, text: str):
+        """Store the user message and run memory commands; returns their reply, or None."""
+        self._load_window()
         self.mem.add_message(self.session, "user", text)
         self.short_window.append(("user", text))
+        self.window.add("user", text)
         # auto-detect memory commands
         if text.startswith("!remember "):
             payload = text[len("!remember "):].strip()
@@ -51,17 +100,7 @@ class NiblitCore:
             key = text[len("!forget "):].strip()
             self.mem.forget_fact(key)
             return f"Forgot {key}."
-
-        # normal flow
-        prompt = self._build_prompt(text)
-        resp = self.adapter.generate(prompt, max_tokens=512)
-        self.mem.add_message(self.session, "assistant", resp)
-        # simple adaptive behavior: if user says "be more concise" update behavior
-        if "be more concise" in text.lower():
-            self.behavior["verbosity"] = "low"
-        if "be more detailed" in text.lower():
-            self.behavior["verbosity"] = "high"
-        return resp
+        return None
 
     def review_memory(self):
         facts = self.mem.get_facts(limit=50)
@@ -1,6 +1,6 @@
 # run.py
 from niblit_core import NiblitCore
-from model_adapters import EchoAdapter, OpenAIAdapter, LlamaCppAdapter
+from model_adapters import EchoAdapter, OpenAIAdapter, LlamaCppAdapter, MicroBatcher
 import os
 
 def pick_adapter():
@@ -9,7 +9,12 @@ def pick_adapter():
     llama_model = os.environ.get("NIBLIT_LLAMA_MODEL")
     if llama_model:
         print("Using local Llama adapter with model:", llama_model)
-        return LlamaCppAdapter(binary_path=os.environ.get("NIBLIT_LLAMA_BIN","llama"), model_path=llama_model)
+        # Set NIBLIT_LLAMA_SERVER to a llama-server binary to keep the model loaded between prompts,
+        # and NIBLIT_LLAMA_PARALLEL > 1 to micro-batch concurrent prompts onto its slots.
+        adapter = LlamaCppAdapter(binary_path=os.environ.get("NIBLIT_LLAMA_BIN","llama"), model_path=llama_model,
+                                  server_binary=os.environ.get("NIBLIT_LLAMA_SERVER") or None,
+                                  parallel=int(os.environ.get("NIBLIT_LLAMA_PARALLEL", "1")))
+        return MicroBatcher(adapter) if adapter.supports_batch else adapter
     openai_key = os.environ.get("OPENAI_API_KEY")
     if openai_key:
         print("Using OpenAI adapter.")
@@ -9,6 +9,13 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Tuple, Optional
 
+from modules.intent_router import IntentRouter
+from modules.keyword_matcher import KeywordMatcher
+from modules.event_bus import EventBus
+from modules.scheduler import default_scheduler
+from modules.sessions import SessionStore
+from modules.status_feed import StatusFeed
+
 # ---------------------------
 # Logging
 # ---------------------------
@@ -63,46 +70,109 @@ _EMO_KEYWORDS = {
     "negative": ["bad","sad","angry","upset","hate","problem","issue","frustrat"],
     "neutral":  ["ok","fine","maybe","later","later"]
 }
+# keywords behind _heuristic_reply; scanned in the same pass as emotions
+_REPLY_KEYWORDS = {
+    "greeting": ["hi","hello"],
+    "how_are_you": ["how are you"],
+    "reflect": ["reflect"],
+}
+KEYWORDS = KeywordMatcher({**_EMO_KEYWORDS, **_REPLY_KEYWORDS})
 
-def detect_emotion(text: str) -> str:
-    tl = text.lower()
-    score = {"positive":0,"negative":0,"neutral":0}
-    for k, words in _EMO_KEYWORDS.items():
-        for w in words:
-            if w in tl:
-                score[k] += 1
+def detect_emotion(text: str, found=None) -> str:
+    """`found` is KEYWORDS.keywords(text), if the caller already scanned it."""
+    counts = KEYWORDS.counts(text, found)
+    score = {k: counts[k] for k in _EMO_KEYWORDS}
     # pick highest, fallback neutral
     best = max(score.items(), key=lambda x: (x[1], x[0]))
     return best[0] if best[1] > 0 else "neutral"
 
 # ---------------------------
-# Intent parser (simple)
+# Intent handlers (dispatch table)
 # ---------------------------
-def parse_intent(text: str) -> Tuple[str, Dict[str,str]]:
-    t = text.strip().lower()
-    # common commands
-    if t.startswith("remember "):
-        # remember key: value
-        payload = t[len("remember "):].strip()
-        if ":" in payload:
-            k,v = payload.split(":",1)
-            return "remember", {"key":k.strip(), "value":v.strip()}
-        return "bad_remember", {}
-    if t in ("time", "what time is it", "current time"):
-        return "time", {}
-    if "weather" in t:
-        return "weather", {}
-    if t in ("help", "commands"):
-        return "help", {}
-    if t in ("status", "health"):
-        return "status", {}
-    if t in ("shutdown","exit","quit"):
-        return "shutdown", {}
-    if t.startswith("learn about "):
-        return "learn", {"topic": t[len("learn about "):].strip()}
-    if t.startswith("ideas about "):
-        return "ideas", {"topic": t[len("ideas about "):].strip()}
-    return "chat", {}
+class Turn:
+    """Per-turn state handed to intent handlers; a handler may override the tone or hint."""
+    __slots__ = ("session", "found", "tone", "hint")
+
+    def __init__(self, session, found, tone):
+        self.session = session
+        self.found = found      # KEYWORDS.keywords(text), scanned once per turn
+        self.tone = tone
+        self.hint = None
+
+intents = IntentRouter()
+
+@intents.prefix("remember ")
+def _intent_remember(core, turn, text, payload):
+    # remember key: value
+    payload = payload.lower()
+    if ":" not in payload:
+        return _intent_chat(core, turn, text, "")
+    k,v = (p.strip() for p in payload.split(":",1))
+    if core.memory and hasattr(core.memory, "set"):
+        safe_call(core.memory.set, k, v)
+        return f"Saved: {k}"
+    return "Memory module unavailable."
+
+@intents.exact("time", "what time is it", "current time")
+def _intent_time(core, turn, text, arg):
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+@intents.exact("help", "commands")
+def _intent_help(core, turn, text, arg):
+    return core.help_text()
+
+@intents.exact("status", "health")
+def _intent_status(core, turn, text, arg):
+    return core.status_text()
+
+@intents.exact("shutdown", "exit", "quit")
+def _intent_shutdown(core, turn, text, arg):
+    # schedule shutdown asynchronously
+    threading.Thread(target=core.shutdown, daemon=True).start()
+    turn.tone, turn.hint = "assertive", "shutdown scheduled"
+    return "Shutting down per request."
+
+@intents.prefix("learn about ")
+def _intent_learn(core, turn, text, topic):
+    topic = topic.lower()
+    # try a bridge fetch or call network fetch if available
+    fetched = None
+    if core.bridge_available:
+        try:
+            fetched = call_external(f"Summarize: {topic}")
+        except Exception:
+            fetched = None
+    # fallback
+    if not fetched and core.network and hasattr(core.network, "fetch_json"):
+        try:
+            fetched = safe_call(core.network.fetch_json, f"https://api.allorigins.win/raw?url=https://en.wikipedia.org/wiki/{topic.replace(' ','_')}")
+        except Exception:
+            fetched = None
+    reply = fetched if fetched else f"Couldn't fetch deep data for '{topic}'."
+    return str(reply)[:1000]
+
+@intents.prefix("ideas about ")
+def _intent_ideas(core, turn, text, topic):
+    turn.tone = "warm"
+    return f"Here are quick ideas for {topic.lower()}: 1) Prototype 2) Monetize 3) Iterate"
+
+@intents.pattern("weather")
+def _intent_weather(core, turn, text, m):
+    if core.network and hasattr(core.network, "get_weather"):
+        return str(safe_call(core.network.get_weather))
+    return "Weather service is unavailable."
+
+@intents.fallback
+def _intent_chat(core, turn, text, arg):
+    # small-chat → try bridge → local heuristic
+    if core.bridge_available:
+        try:
+            resp = call_external(text)
+            if resp:
+                return resp
+        except Exception:
+            log.debug("Bridge call failed fallback.")
+    return core._heuristic_reply(text, turn.found, turn.session.persona)
 
 # ---------------------------
 # NiblitCore
@@ -141,22 +211,26 @@ class NiblitCore:
 
         # runtime flags
         self.running = True
-        self._bg_threads: List[threading.Thread] = []
+        self._bg_jobs = []  # scheduler jobs, cancelled on shutdown
 
-        # event bus
-        self.event_bus: List[Tuple[str, Any]] = []
+        # event bus: handlers run on its dispatch thread as events arrive
+        self.event_bus = EventBus(name="niblit-events")
+        self.event_bus.subscribe("sync_memory", lambda e, p: self._sync_memory_to_cloud(p))
 
-        # personality state (hybrid)
+        # personality defaults (hybrid); each session gets its own copy plus
+        # its recent emotions and last message
         self.persona = {
             "mode": "hybrid",      # hybrid A/B/C
             "tone": "balanced",    # balanced / warm / assertive
-            "emotion_history": [], # recent detected emotions
-            "last_user": None
         }
+        self.sessions = SessionStore(persona=self.persona)
 
         # internal quick caches
         self._last_health = None
 
+        # pushed to dashboards when it changes; sampled only while watched
+        self.status_feed = StatusFeed(self.status_snapshot)
+
         # start background tasks
         self._start_background_threads()
 
@@ -165,27 +239,36 @@ class NiblitCore:
     # ---------------------------
     # Event bus helpers
     # ---------------------------
-    def emit(self, event: str, payload: Any = None):
-        self.event_bus.append((event, payload))
-        log.debug("Event emitted: %s -> %s", event, payload)
+    def emit(self, event: str, payload: Any = None) -> bool:
+        ok = self.event_bus.emit(event, payload)
+        if ok:
+            log.debug("Event emitted: %s -> %s", event, payload)
+        else:
+            log.warning("Event dropped (queue full): %s", event)
+        return ok
+
+    def subscribe(self, event: str, handler):
+        """Run handler(event, payload) for each `event` ("*" for all) as it is emitted."""
+        return self.event_bus.subscribe(event, handler)
 
     def read_events(self) -> List[Tuple[str, Any]]:
-        ev = self.event_bus[:]
-        self.event_bus.clear()
-        return ev
+        """Events emitted since the last call that no subscriber handled."""
+        return self.event_bus.read_events()
 
     # ---------------------------
     # Background threads
     # ---------------------------
     def _start_background_threads(self):
-        t1 = threading.Thread(target=self._background_loop, daemon=True, name="niblit-bg")
-        t2 = threading.Thread(target=self._health_monitor, daemon=True, name="niblit-health")
-        t1.start(); t2.start()
-        self._bg_threads.extend([t1,t2])
-
-    def _background_loop(self):
+        # periodic work runs as jobs on the shared scheduler, not as own threads
+        sched = default_scheduler()
+        self._bg_jobs = [
+            sched.every(3, self._background_tick, name="niblit-bg", delay=0),
+            sched.every(30, self._health_tick, name="niblit-health", jitter=1.0, delay=0),
+        ]
+
+    def _background_tick(self):
         """Frequent maintenance: flush, train, sensors, self-heal hooks."""
-        while self.running:
+        if self.running:
             try:
                 # collector/trainer
                 if self.collector:
@@ -204,21 +287,12 @@ class NiblitCore:
                 if self.self_maintenance and hasattr(self.self_maintenance, "diagnose"):
                     safe_call(self.self_maintenance.diagnose)
 
-                # periodic event processing
-                evs = self.read_events()
-                for e,p in evs:
-                    log.debug("Processing event from background: %s -> %s", e, p)
-                    # implement small auto-actions
-                    if e == "sync_memory":
-                        self._sync_memory_to_cloud(p)
-
             except Exception as e:
                 log.exception("Background loop exception: %s", e)
-            time.sleep(3)
 
-    def _health_monitor(self):
+    def _health_tick(self):
         """Lower-frequency health heartbeat and autosave."""
-        while self.running:
+        if self.running:
             try:
                 uptime_s = int(time.time() - self.start_ts)
                 mem_count = 0
@@ -234,7 +308,6 @@ class NiblitCore:
                     safe_call(self.memory.autosave)
             except Exception as e:
                 log.exception("Health monitor error: %s", e)
-            time.sleep(30)
 
     # ---------------------------
     # Memory & sync helpers
@@ -309,122 +382,52 @@ class NiblitCore:
     # ---------------------------
     # Chat / respond API (intent-aware)
     # ---------------------------
-    def respond(self, text: str) -> str:
-        """Main entry: parse intent, update persona, produce a reply."""
+    def respond(self, text: str, session_id: Optional[str] = None) -> str:
+        """Main entry: parse intent, update persona, produce a reply.
+
+        State (persona, history) is kept per `session_id`; turns of one
+        session run one at a time, different sessions run concurrently.
+        """
         if not text:
             return "..."
-
-        user_text = text.strip()
-        self.persona["last_user"] = user_text
-        emotion = detect_emotion(user_text)
-        self.persona["emotion_history"].append((now_iso(), emotion))
-        # keep history short
-        if len(self.persona["emotion_history"]) > 40:
-            self.persona["emotion_history"] = self.persona["emotion_history"][-40:]
-        tone = self._choose_tone(emotion)
-
-        intent, meta = parse_intent(user_text)
-
+        session = self.sessions.get(session_id)
+        with session.lock:
+            reply = self._respond(text.strip(), session)
+            session.add("user", text.strip())
+            session.add("assistant", reply)
+            return reply
+
+    def _respond(self, user_text: str, session) -> str:
+        persona = session.persona
+        persona["last_user"] = user_text
+        # one keyword scan serves both emotion detection and heuristic replies
+        found = KEYWORDS.keywords(user_text)
+        emotion = detect_emotion(user_text, found)
+        persona["emotion_history"].append((now_iso(), emotion))  # bounded deque
+        turn = Turn(session, found, self._choose_tone(emotion))
         try:
-            # command intents
-            if intent == "remember":
-                k = meta.get("key"); v = meta.get("value")
-                if self.memory and hasattr(self.memory, "set"):
-                    safe_call(self.memory.set, k, v)
-                    reply = f"Saved: {k}"
-                else:
-                    reply = "Memory module unavailable."
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, tone)
-
-            if intent == "time":
-                reply = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, tone)
-
-            if intent == "weather":
-                if self.network and hasattr(self.network, "get_weather"):
-                    reply = str(safe_call(self.network.get_weather))
-                else:
-                    reply = "Weather service is unavailable."
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, tone)
-
-            if intent == "help":
-                reply = self.help_text()
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, tone)
-
-            if intent == "status":
-                reply = self.status_text()
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, tone)
-
-            if intent == "shutdown":
-                reply = "Shutting down per request."
-                # schedule shutdown asynchronously
-                threading.Thread(target=self.shutdown, daemon=True).start()
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, "assertive", autonomous_hint="shutdown scheduled")
-
-            if intent == "learn":
-                topic = meta.get("topic","")
-                # try a bridge fetch or call network fetch if available
-                fetched = None
-                if self.bridge_available:
-                    try:
-                        fetched = call_external(f"Summarize: {topic}")
-                    except Exception:
-                        fetched = None
-                # fallback
-                if not fetched and self.network and hasattr(self.network, "fetch_json"):
-                    try:
-                        fetched = safe_call(self.network.fetch_json, f"https://api.allorigins.win/raw?url=https://en.wikipedia.org/wiki/{topic.replace(' ','_')}")
-                    except Exception:
-                        fetched = None
-                reply = fetched if fetched else f"Couldn't fetch deep data for '{topic}'."
-                self._store_interaction(user_text, str(reply))
-                return self._format_reply(str(reply)[:1000], tone)
-
-            if intent == "ideas":
-                topic = meta.get("topic","")
-                reply = f"Here are quick ideas for {topic}: 1) Prototype 2) Monetize 3) Iterate"
-                self._store_interaction(user_text, reply)
-                return self._format_reply(reply, "warm")
-
-            # fallback: small-chat → try bridge → local heuristic
-            if self.bridge_available:
-                try:
-                    resp = call_external(user_text)
-                    if resp:
-                        self._store_interaction(user_text, resp)
-                        return self._format_reply(resp, tone)
-                except Exception:
-                    log.debug("Bridge call failed fallback.")
-
-            # local heuristics
-            generic = self._heuristic_reply(user_text)
-            self._store_interaction(user_text, generic)
-            return self._format_reply(generic, tone)
-
+            reply = intents.dispatch(user_text, self, turn)
+            self._store_interaction(user_text, reply)
+            return self._format_reply(reply, turn.tone, autonomous_hint=turn.hint)
         except Exception as e:
             log.exception("Error while responding: %s", e)
             fallback = f"I heard: \"{user_text}\". (error: {e})"
             self._store_interaction(user_text, fallback)
             return self._format_reply(fallback, "calm")
 
-    def _heuristic_reply(self, text: str) -> str:
+    def _heuristic_reply(self, text: str, found=None, persona=None) -> str:
         # quick local replies & small personality
-        tl = text.lower()
-        if "hi" in tl or "hello" in tl:
+        hits = KEYWORDS.scan(text, found)
+        if hits["greeting"]:
             return f"Hi — I'm Niblit. How can I help?"
-        if "how are you" in tl:
+        if hits["how_are_you"]:
             return "Learning and improving — thanks for asking."
-        if "reflect" in tl:
+        if hits["reflect"]:
             # produce a short reflection summary
-            hist = [e for _,e in self.persona["emotion_history"][-10:]]
+            emotions = list((persona or {}).get("emotion_history", ()))
+            hist = [e for _,e in emotions[-10:]]
             most = max(set(hist), key=hist.count) if hist else "neutral"
-            return f"I've been {most} lately. Memory size: {len(self.persona['emotion_history'])}."
+            return f"I've been {most} lately. Memory size: {len(emotions)}."
         # default echo paraphrase
         return f"I heard you say: \"{text}\"."
 
@@ -443,6 +446,24 @@ class NiblitCore:
             "  reflect              - internal reflection\n            " "shutdown             - stop Niblit\n"
         )
 
+    def status_snapshot(self) -> Dict[str, Any]:
+        """Dashboard status without the clock: only real changes produce a push."""
+        memory = self.memory
+        entries = getattr(memory, "data", None) or getattr(memory, "memory", None) or {}
+        sensors = getattr(niblit_sensors, "SENSOR_STATUS", None) if self.sensors else None
+        if sensors:
+            # gps jitters and last_update ticks on every read; push only whether there is a fix
+            sensors = {"gps": sensors.get("gps") is not None, "camera": bool(sensors.get("camera")),
+                       "microphone": bool(sensors.get("microphone"))}
+        return {
+            "started_ts": self.start_ts,
+            "memory_entries": len(entries),
+            "network": getattr(self.network, "status", "offline") if self.network else "offline",
+            "persona_tone": self.persona.get("tone"),
+            "bridge": self.bridge_available,
+            "sensors": sensors or None,
+        }
+
     def status_text(self) -> str:
         uptime = int(time.time() - self.start_ts)
         mem_entries = 0
@@ -457,7 +478,10 @@ class NiblitCore:
             "memory_entries": mem_entries,
             "network": net,
             "persona_tone": self.persona.get("tone"),
-            "bridge": self.bridge_available
+            "bridge": self.bridge_available,
+            "sessions": self.sessions.stats(),
+            "events": self.event_bus.stats(),
+            "status_feed": self.status_feed.stats()
         })
 
     # ---------------------------
@@ -466,8 +490,10 @@ class NiblitCore:
     def shutdown(self):
         log.info("[NiblitCore] Shutdown initiated...")
         self.running = False
-        # allow background threads to wrap
-        time.sleep(0.5)
+        for job in self._bg_jobs:
+            job.cancel()
+        if self.sensors and hasattr(self.sensors, "close"):
+            safe_call(self.sensors.close)
         # optional graceful component shutdowns
         try:
             if self.network and hasattr(self.network, "shutdown"):
@@ -475,10 +501,13 @@ class NiblitCore:
         except Exception:
             pass
         try:
-            if self.memory and hasattr(self.memory, "autosave"):
+            if self.memory and hasattr(self.memory, "flush"):
+                self.memory.flush()
+            elif self.memory and hasattr(self.memory, "autosave"):
                 self.memory.autosave()
         except Exception:
             pass
+        self.event_bus.close()
         log.info("[NiblitCore] Shutdown complete.")
 
 # ---------------------------
@@ -6,10 +6,58 @@ import json
 # Modules
 import niblit_network, self_maintenance, niblit_sensors, niblit_voice
 import collector, trainer, generator, membrane, healer, slsa_generator, niblit_memory
+from modules.llm_registry import LLMBackendRegistry
+from modules.intent_router import IntentRouter
+from modules.sessions import SessionStore
+from modules.interaction_log import InteractionLog
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 log = logging.getLogger("NiblitCoreRefactor")
 
+# -------------------------------------------------------
+# Command routing
+routes = IntentRouter()
+
+@routes.pattern(r"\btime\b")
+def _route_time(core, session, prompt, m):
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+@routes.pattern(r"\bweather\b")
+def _route_weather(core, session, prompt, m):
+    try:
+        return str(core.network.get_weather())
+    except:
+        return "Weather service offline."
+
+@routes.prefix("remember ")
+def _route_remember(core, session, prompt, rest):
+    try:
+        k, v = rest.split(":", 1)
+        core.memory.set(k.strip(), v.strip())
+        return f"Remembered {k.strip()}."
+    except:
+        return "Format: remember key: value"
+
+@routes.fallback
+def _route_llm(core, session, prompt, arg):
+    # Fallback / LLM response
+    llm = core.llm_backend()
+    if llm is None:
+        return f"(No LLM) Echo: {prompt[:200]}"
+    if not llm.is_available():
+        # no keys configured: not a health failure, so keep the backend
+        return llm.fallback(prompt)
+    try:
+        # only this session's turns, never other users'; strict so a provider
+        # failure reaches the registry instead of hiding behind the fallback
+        response = llm.query(prompt, context=session.context(), strict=True)
+    except Exception as e:
+        log.debug("LLM query failed: %s", e)
+        core.llm_backends.report(ok=False)
+        return llm.fallback(prompt)
+    core.llm_backends.report(ok=True)
+    return response
+
 class niblitcore:
     def __init__(self):
         self.name = "Niblit"
@@ -38,8 +86,17 @@ class niblitcore:
         # Flags
         self.running = True
 
-        # Interaction log for website output
-        self.interactions = []
+        # Interaction log for website output: newest turns in a fixed ring,
+        # older ones spilled to a JSONL archive (see InteractionLog)
+        self.interactions = InteractionLog()
+
+        # Per-client history used as LLM context (bounded, LRU-evicted)
+        self.sessions = SessionStore()
+
+        # Long-lived LLM backends, built once and warmed up in the background
+        self.llm_backends = LLMBackendRegistry()
+        self.llm_backends.register("default", self._make_llm)
+        threading.Thread(target=self.llm_backends.warm_up, daemon=True).start()
 
         # Background loop
         t = threading.Thread(target=self._background_loop, daemon=True)
@@ -47,6 +104,16 @@ class niblitcore:
 
         log.info("[INFO] NiblitCoreRefactor Initialized successfully.")
 
+    # -------------------------------------------------------
+    # LLM backend
+    def _make_llm(self):
+        from modules.llm_adapter import LLMAdapter
+        return LLMAdapter(self.memory)
+
+    def llm_backend(self, name="default"):
+        """Shared LLMAdapter for this core (None while cooling down after failures)."""
+        return self.llm_backends.get(name)
+
     # -------------------------------------------------------
     # Background thread (silent logging)
     def _background_loop(self):
@@ -76,44 +143,23 @@ class niblitcore:
 
     # -------------------------------------------------------
     # Core respond method
-    def respond(self, prompt):
+    def respond(self, prompt, session_id=None):
         prompt = prompt.strip()
         if not prompt:
             return "..."
 
         # store user input
         self.collector.add({"type": "utterance", "text": prompt})
-        self.interactions.append({"role": "user", "text": prompt})
+        self.interactions.add("user", prompt)
 
-        # Time request
-        if "time" in prompt.lower():
-            response = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-        # Weather request
-        elif "weather" in prompt.lower():
-            try:
-                response = str(self.network.get_weather())
-            except:
-                response = "Weather service offline."
-        # Memory store
-        elif prompt.lower().startswith("remember "):
-            try:
-                _, rest = prompt.split(" ", 1)
-                k, v = rest.split(":", 1)
-                self.memory.set(k.strip(), v.strip())
-                response = f"Remembered {k.strip()}."
-            except:
-                response = "Format: remember key: value"
-        else:
-            # Fallback / LLM response
-            try:
-                from modules.llm_adapter import LLMAdapter
-                llm = LLMAdapter(self.memory)
-                response = llm.query(prompt, context=self.interactions)
-            except Exception as e:
-                response = f"(No LLM) Echo: {prompt[:200]}"
+        session = self.sessions.get(session_id)
+        with session.lock:
+            response = routes.dispatch(prompt, self, session)
+            session.add("user", prompt)
+            session.add("assistant", response)
 
         # Log assistant response
-        self.interactions.append({"role": "assistant", "text": response})
+        self.interactions.add("assistant", response)
         return response
 
     # -------------------------------------------------------
@@ -125,7 +171,9 @@ class niblitcore:
             "memory_entries": len(self.memory.data) if hasattr(self.memory, "data") else 0,
             "network": "online" if getattr(self.network, "is_online", False) else "offline",
             "bridge": True,
-            "persona_tone": "balanced"
+            "persona_tone": "balanced",
+            "sessions": self.sessions.stats(),
+            "interactions": self.interactions.stats()
         }
 
     # -------------------------------------------------------
@@ -137,4 +185,9 @@ class niblitcore:
             self.network.shutdown()
         except:
             pass
+        try:
+            self.memory.flush()
+        except:
+            pass
+        self.interactions.close()
         log.info("Niblit Core shutdown complete.")
\ No newline at end of file
@@ -13,6 +13,13 @@ BoxLayout:
         title: 'Niblit'
         elevation: 4
         md_bg_color: app.theme_cls.primary_color
+    MDLabel:
+        id: status_label
+        text: 'Sensors: -'
+        size_hint_y: None
+        height: dp(24)
+        padding_x: dp(8)
+        theme_text_color: 'Secondary'
     ScrollView:
         id: scroll
         do_scroll_x: False
@@ -50,7 +57,15 @@ class DashboardApp(MDApp):
 
     def on_start(self):
         Clock.schedule_once(lambda dt: self.add_message('system','Niblit online.'), 0.4)
-        Clock.schedule_interval(lambda dt: self._update_status(), 5)
+        # sensor status is pushed by the core when it changes, no polling
+        feed = getattr(self.core, 'status_feed', None)
+        if feed:
+            feed.subscribe(self._on_status)
+
+    def on_stop(self):
+        feed = getattr(self.core, 'status_feed', None)
+        if feed:
+            feed.unsubscribe(self._on_status)
 
     def add_message(self, who, text):
         box = self.root.ids.chat_box
@@ -74,20 +89,13 @@ class DashboardApp(MDApp):
         self.add_message('niblit', resp)
         self.root.ids.user_input.text = ''
 
-    def _update_status(self):
-        try:
-            if self.core and hasattr(self.core, 'sensors'):
-                s = getattr(self.core, 'sensors', None)
-                if s and hasattr(s, 'SENSOR_STATUS'):
-                    st = s.SENSOR_STATUS if hasattr(s, 'SENSOR_STATUS') else None
-                else:
-                    st = None
-            else:
-                st = None
-            if st:
-                self.add_message('system', f"GPS: {st.get('gps')}, last: {st.get('last_update')}")
-        except Exception:
-            pass
+    def _on_status(self, changes):
+        # runs on the feed's thread; widgets may only be touched from the Kivy loop
+        if 'sensors' not in changes:
+            return
+        st = changes['sensors'] or {}
+        text = 'Sensors: ' + (', '.join(f"{k} {'on' if v else 'off'}" for k, v in st.items()) or '-')
+        Clock.schedule_once(lambda dt: setattr(self.root.ids.status_label, 'text', text), 0)
 
 def launch_dashboard(core=None):
     app = DashboardApp(core=core)
@@ -1,37 +1,158 @@
 # niblit_memory.py
 
-import json, threading, time, logging
+import json, os, bisect, threading, time, logging
+from modules.scheduler import default_scheduler
+from modules.fact_index import FactIndex
 
 log = logging.getLogger("NiblitMemory")
 
 class MemoryManager:
-    def __init__(self, filename="niblit_memory.json"):
+    """Key/value memory persisted to a JSON file.
+
+    Every mutation bumps a generation counter; a save only happens when the
+    in-memory generation is ahead of the last one written. Saves copy the
+    dict under the lock and serialize/write outside it (tmp file + atomic
+    rename), so set/get never wait on disk I/O. Background saves run as a
+    job on the shared scheduler every `debounce` seconds (at most every
+    `autosave_interval`) and write only when something changed.
+
+    The file keeps each key's last-update time next to its value, so
+    time-range queries still work after a restart. A file in the old
+    plain {key: value} layout loads with the file's mtime as every key's
+    update time.
+    """
+    FORMAT = 2
+    def __init__(self, filename="niblit_memory.json", autosave_interval=60, debounce=2.0):
         self.filename = filename
         self.lock = threading.Lock()
+        self._save_lock = threading.Lock()
         self.memory = {}
-        self.autosave_interval = 60
-        t = threading.Thread(target=self._autosave_loop, daemon=True)
-        t.start()
+        self._updated = {}       # key -> time of its last set()
+        self._sorted = (-1, [])  # (generation, sorted keys) for paging
+        self._index = None       # FactIndex keyed by key, built on first search
+        self.autosave_interval = autosave_interval
+        self.debounce = debounce
+        self._generation = 0
+        self._saved_generation = 0
+        self._last_save = 0.0
+        self._load()
+        self._job = default_scheduler().every(min(debounce, autosave_interval) or autosave_interval,
+                                              self.autosave, name="memory-autosave")
+
+    def _load(self):
+        try:
+            with open(self.filename) as f:
+                data = json.load(f)
+            mtime = os.path.getmtime(self.filename)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log.debug(f"[Memory Load Error] {e}")
+            return
+        if not isinstance(data, dict):
+            return
+        if data.get("_format") == self.FORMAT:
+            memory, updated = data.get("memory") or {}, data.get("updated") or {}
+        else:
+            memory, updated = data, {}
+        self.memory = dict(memory)
+        self._updated = {k: float(updated.get(k, mtime)) for k in self.memory}
+
+    @property
+    def dirty(self):
+        return self._generation != self._saved_generation
+
+    @property
+    def generation(self):
+        return self._generation
 
     def set(self, key, value):
         with self.lock:
             self.memory[key] = value
+            self._updated[key] = time.time()
+            self._generation += 1
+            if self._index is not None:
+                self._index.add(key, key, value, {"key": key, "value": value, "ts": self._updated[key]})
         log.debug(f"[Memory Set] {key}: {value}")
 
     def get(self, key, default=None):
         with self.lock:
             return self.memory.get(key, default)
 
-    def autosave(self):
+    def search_facts(self, query, limit=5):
+        """Entries ranked by BM25 relevance to `query`, best first (LLM fallback)."""
         with self.lock:
+            if self._index is None:
+                self._index = FactIndex()
+                for k, v in self.memory.items():
+                    self._index.add(k, k, v, {"key": k, "value": v, "ts": self._updated.get(k, 0)})
+            return [f for _, _, f in self._index.search(query, limit)]
+
+    def query_facts(self, prefix=None, tag=None, since=None, until=None, cursor=None, limit=50):
+        """One page of entries in key order, plus the key to resume after (None at the end).
+
+        Entries carry no tags, so a tag filter matches nothing. Sorted keys
+        are cached per generation; a page is a bisect plus `limit` lookups.
+        """
+        if tag:
+            return [], None
+        with self.lock:
+            gen, keys = self._sorted
+            if gen != self._generation:
+                keys = sorted(self.memory)
+                self._sorted = (self._generation, keys)
+            start = bisect.bisect_right(keys, cursor) if cursor is not None else 0
+            if prefix:
+                start = max(start, bisect.bisect_left(keys, prefix))
+            out, last = [], None
+            for i in range(start, len(keys)):
+                key = keys[i]
+                if prefix and not key.startswith(prefix):
+                    break
+                ts = self._updated.get(key, 0)
+                if (since is not None and ts < since) or (until is not None and ts >= until):
+                    continue
+                if len(out) == limit:
+                    return out, last
+                out.append({"key": key, "value": self.memory[key], "ts": ts})
+                last = key
+        return out, None
+
+    def autosave(self, force=False):
+        """Write the memory file if anything changed.
+
+        Unless force is set, a save requested within `debounce` seconds of
+        the previous one is left to the next scheduled run. Returns True if
+        the file was written.
+        """
+        if not self.dirty:
+            return False
+        if not force and time.time() - self._last_save < self.debounce:
+            return False
+        with self._save_lock:
+            with self.lock:
+                generation = self._generation
+                if generation == self._saved_generation:
+                    return False
+                snapshot = {"_format": self.FORMAT, "memory": dict(self.memory),
+                            "updated": dict(self._updated)}
             try:
-                with open(self.filename, 'w') as f:
-                    json.dump(self.memory, f)
+                tmp = self.filename + ".tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp, self.filename)
+                self._saved_generation = generation
+                self._last_save = time.time()
                 log.debug("[Memory Autosaved]")
+                return True
             except Exception as e:
                 log.debug(f"[Memory Autosave Error] {e}")
+                return False
+
+    def flush(self):
+        return self.autosave(force=True)
 
-    def _autosave_loop(self):
-        while True:
-            self.autosave()
-            time.sleep(self.autosave_interval)
\ No newline at end of file
+    def close(self):
+        """Stop background saves and write any pending change."""
+        self._job.cancel()
+        return self.flush()
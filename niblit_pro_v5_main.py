@@ -4,7 +4,9 @@
 # Python 3.9+ recommended. Put secrets in .env file.
 
 import os
+import re
 import sys
+import math
 import time
 import json
 import base64
@@ -64,6 +66,28 @@ def now_iso():
 def safe_load_env(key: str, default: str = "") -> str:
     return os.getenv(key, default).strip()
 
+# ---------- Scheduler ----------
+# Every periodic job (compaction, membrane sync/decay, reflection, self-train,
+# alerts) runs on the shared modules/scheduler.py timer instead of a sleeping
+# thread per loop. Its worker pool (NIBLIT_SCHEDULER_WORKERS) keeps a slow
+# network job from holding up the rest.
+try:
+    from modules.scheduler import Scheduler
+except ImportError:
+    # run from NiblitProV5/: the shared modules live one level up
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from modules.scheduler import Scheduler
+
+SCHEDULER = Scheduler(name="niblit-v5")
+
+# ---------- Pooled HTTP ----------
+# modules/http_pool.py: one keep-alive connection pool shared by every
+# thread's Session, so chat turns reuse the TLS connection to the LLM host.
+if requests is not None:
+    from modules.http_pool import get_session as http_session
+else:
+    http_session = None
+
 # ---------- Encryption Manager ----------
 KEY_FILE = os.getenv("NIBLIT_KEY_FILE", "niblit_key.key")
 class EncryptionManager:
@@ -156,11 +180,42 @@ MEMORY_DIR = "niblit_memory"
 os.makedirs(MEMORY_DIR, exist_ok=True)
 
 class TrainingDB:
-    def __init__(self, path=os.path.join(MEMORY_DIR,"niblit_memory.json")):
+    """Training memory store.
+
+    In journal mode (the default) every add_entry appends one JSON line to a
+    write-ahead journal next to the snapshot, so an insert costs the same no
+    matter how big the store is. A background thread periodically folds the
+    journal back into the snapshot file (compaction). Set
+    NIBLIT_MEMORY_JOURNAL=False to fall back to rewriting the snapshot on
+    every insert.
+    """
+    def __init__(self, path=os.path.join(MEMORY_DIR,"niblit_memory.json"), journal: Optional[bool] = None,
+                 compact_interval: Optional[float] = None, compact_threshold: int = 500):
         self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal.jsonl"
+        if journal is None:
+            journal = safe_load_env("NIBLIT_MEMORY_JOURNAL","True") == "True"
+        self.journal = journal
+        if compact_interval is None:
+            compact_interval = float(safe_load_env("NIBLIT_MEMORY_COMPACT_INTERVAL","300"))
+        self.compact_interval = compact_interval
+        self.compact_threshold = compact_threshold
         self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._compact_job = None
+        self._journal_fh = None
+        self._journal_lines = 0
+        self._seq = 0
+        # inverted index: token -> ids of entries whose input contains it.
+        # An entry's id is its list position plus self._base, so evicting from
+        # the front only has to bump _base and drop postings.
+        self._postings: Dict[str, set] = {}
+        self._grams: Dict[str, set] = {}
+        self._base = 0
         self.data = {"entries": [], "meta": {"created": now_iso()}}
         self._load()
+        if self.journal:
+            self._compact_job = SCHEDULER.every(self.compact_interval, self._compact_if_needed, name="memory-compact")
 
     def _load(self):
         if os.path.exists(self.path):
@@ -168,15 +223,174 @@ class TrainingDB:
                 self.data = json.load(open(self.path,"r", encoding="utf-8"))
             except Exception:
                 self.data = {"entries": [], "meta": {"created": now_iso()}}
+        self.data.setdefault("entries", [])
+        self.data.setdefault("meta", {"created": now_iso()})
+        self._seq = int(self.data["meta"].get("journal_seq", 0))
+        self._replay_journal()
+        self.data["meta"]["journal_seq"] = self._seq
+        self._reindex()
         self._save()
 
+    def _replay_journal(self):
+        # re-apply entries appended since the last snapshot; a torn final line
+        # (crash mid-write) is skipped
+        for jp in (self.journal_path + ".compacting", self.journal_path):
+            if not os.path.exists(jp):
+                continue
+            try:
+                with open(jp, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            continue
+                        if rec.get("seq", 0) <= self._seq:
+                            continue
+                        self._seq = rec["seq"]
+                        self.data["entries"].append(rec["entry"])
+            except Exception:
+                _log({"kind":"memory_journal_replay_error","err":traceback.format_exc()})
+        self._trim()
+
+    def _trim(self):
+        # keep memory bounded
+        if len(self.data["entries"]) > 5000:
+            drop = len(self.data["entries"]) - 4000
+            for i, e in enumerate(self.data["entries"][:drop]):
+                self._unindex(self._base + i, e)
+            self._base += drop
+            self.data["entries"] = self.data["entries"][drop:]
+
+    # ---- token index ----
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return re.findall(r"\w+", (text or "").lower())
+
+    @staticmethod
+    def _trigrams(tok: str) -> set:
+        t = f" {tok} "
+        return {t[i:i+3] for i in range(len(t) - 2)}
+
+    def _index(self, eid: int, entry: dict):
+        for tok in set(self._tokens(entry.get("input", ""))):
+            ids = self._postings.get(tok)
+            if ids is None:
+                ids = self._postings[tok] = set()
+                for g in self._trigrams(tok):
+                    self._grams.setdefault(g, set()).add(tok)
+            ids.add(eid)
+
+    def _unindex(self, eid: int, entry: dict):
+        for tok in set(self._tokens(entry.get("input", ""))):
+            ids = self._postings.get(tok)
+            if ids is None:
+                continue
+            ids.discard(eid)
+            if not ids:
+                del self._postings[tok]
+                for g in self._trigrams(tok):
+                    toks = self._grams.get(g)
+                    if toks is not None:
+                        toks.discard(tok)
+                        if not toks:
+                            del self._grams[g]
+
+    def _reindex(self):
+        self._postings, self._grams = {}, {}
+        for i, e in enumerate(self.data["entries"]):
+            self._index(self._base + i, e)
+
+    def _similar_tokens(self, tok: str, cutoff: float) -> List[tuple]:
+        # vocabulary tokens sharing enough character trigrams with tok
+        grams = self._trigrams(tok)
+        counts: Dict[str, int] = {}
+        for g in grams:
+            for cand in self._grams.get(g, ()):
+                counts[cand] = counts.get(cand, 0) + 1
+        out = []
+        for cand, shared in counts.items():
+            sim = shared / float(len(grams) + len(self._trigrams(cand)) - shared)
+            if sim >= cutoff:
+                out.append((cand, sim))
+        return out
+
+    def _write_snapshot(self, data: dict):
+        tmp = self.path + ".tmp"
+        with open(tmp,"w", encoding="utf-8") as f:
+            f.write(json.dumps(data, indent=2))
+        os.replace(tmp, self.path)
+
     def _save(self):
+        """Write a full snapshot now (folds any pending journal lines in)."""
+        if self.journal:
+            self.compact()
+            return
         with self._lock:
             try:
-                open(self.path,"w", encoding="utf-8").write(json.dumps(self.data, indent=2))
+                self._write_snapshot(self.data)
             except Exception:
                 _log({"kind":"memory_save_error","err":traceback.format_exc()})
 
+    def compact(self) -> bool:
+        """Fold the journal into the snapshot file.
+
+        The entry list is copied and the journal rotated under the lock; the
+        (slow) snapshot serialization happens outside it so add_entry never
+        waits on it.
+        """
+        with self._compact_lock:
+            with self._lock:
+                if self._journal_fh:
+                    self._journal_fh.close()
+                    self._journal_fh = None
+                rotated = self.journal_path + ".compacting"
+                if os.path.exists(self.journal_path):
+                    self._rotate_journal(rotated)
+                self._journal_lines = 0
+                self.data["meta"]["journal_seq"] = self._seq
+                snap = {"entries": list(self.data["entries"]), "meta": dict(self.data["meta"])}
+            try:
+                self._write_snapshot(snap)
+                if os.path.exists(rotated):
+                    os.remove(rotated)
+                return True
+            except Exception:
+                _log({"kind":"memory_compact_error","err":traceback.format_exc()})
+                return False
+
+    def _rotate_journal(self, rotated: str):
+        # a .compacting file left by a failed compaction still holds lines the
+        # snapshot may lack: append the journal to it instead of replacing it
+        if not os.path.exists(rotated):
+            os.replace(self.journal_path, rotated)
+            return
+        with open(self.journal_path, "rb") as src:
+            lines = src.read()
+        with open(rotated, "ab+") as dst:
+            end = dst.seek(0, os.SEEK_END)
+            if end:
+                dst.seek(end - 1)
+                if dst.read(1) != b"\n":
+                    lines = b"\n" + lines  # torn last line; keep the next record whole
+            dst.write(lines)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_path)
+
+    def _compact_if_needed(self):
+        if self._journal_lines:
+            self.compact()
+
+    def _append_journal(self, entry: dict):
+        if self._journal_fh is None:
+            self._journal_fh = open(self.journal_path, "a", encoding="utf-8")
+        self._seq += 1
+        self._journal_fh.write(json.dumps({"seq": self._seq, "entry": entry}) + "\n")
+        self._journal_fh.flush()
+        self._journal_lines += 1
+        if self._journal_lines >= self.compact_threshold and self._compact_job:
+            self._compact_job.trigger()
+
     def add_entry(self, user_input: str, response: str, source: str = "interactive"):
         entry = {
             "input": user_input,
@@ -186,24 +400,88 @@ class TrainingDB:
         }
         with self._lock:
             self.data["entries"].append(entry)
-            # keep memory bounded
-            if len(self.data["entries"]) > 5000:
-                self.data["entries"] = self.data["entries"][-4000:]
-            self._save()
+            self._index(self._base + len(self.data["entries"]) - 1, entry)
+            self._trim()
+            if self.journal:
+                try:
+                    self._append_journal(entry)
+                except Exception:
+                    _log({"kind":"memory_journal_error","err":traceback.format_exc()})
+                return
+        self._save()
 
-    def find_matches(self, text: str, cutoff: float = 0.45):
-        # simple substring & simple ratio fallback
-        results = []
-        tl = text.lower()
-        for e in self.data["entries"]:
-            if tl in e["input"].lower():
-                results.append((1.0, e))
-        return results
+    def close(self):
+        if self._compact_job:
+            self._compact_job.cancel()
+        if self.journal:
+            self.compact()
+
+    def find_matches(self, text: str, cutoff: float = 0.45, fuzzy: bool = True, limit: int = 10):
+        """Rank stored entries against text using the token index.
+
+        Each query token contributes its IDF weight when an entry's input
+        contains it (or, with fuzzy on, a trigram-similar token scaled by
+        similarity). The score is the matched share of the total query weight;
+        an input containing the whole query verbatim scores 1.0, even when it
+        shares no whole token with it ("ell" in "hello world"). Only results
+        scoring at least cutoff are returned, best first.
+        """
+        qtoks = list(dict.fromkeys(self._tokens(text)))
+        if not qtoks:
+            return []
+        tl = text.lower().strip()
+        with self._lock:
+            n = max(1, len(self.data["entries"]))
+            weights: Dict[int, float] = {}
+            total = 0.0
+            for tok in qtoks:
+                variants = [(tok, 1.0)] if tok in self._postings else []
+                if not variants and fuzzy:
+                    variants = self._similar_tokens(tok, cutoff)
+                df = max([len(self._postings[v]) for v, _ in variants] or [0])
+                idf = math.log(1.0 + n / (1.0 + df))
+                total += idf
+                best: Dict[int, float] = {}
+                for v, sim in variants:
+                    for eid in self._postings[v]:
+                        if sim > best.get(eid, 0.0):
+                            best[eid] = sim
+                for eid, sim in best.items():
+                    weights[eid] = weights.get(eid, 0.0) + idf * sim
+            results = []
+            for eid in self._substring_candidates(qtoks):
+                weights.setdefault(eid, 0.0)
+            for eid, w in weights.items():
+                e = self.data["entries"][eid - self._base]
+                score = 1.0 if tl and tl in e["input"].lower() else w / total
+                if score >= cutoff:
+                    results.append((score, eid, e))
+        results.sort(key=lambda r: (r[0], r[1]), reverse=True)
+        return [(score, e) for score, _, e in results[:limit]]
+
+    def _substring_candidates(self, qtoks: List[str]) -> set:
+        # an input containing the query verbatim has a token containing the
+        # query's longest token, so only those tokens' postings need checking
+        key = max(qtoks, key=len)
+        if len(key) >= 3:
+            grams = [self._grams.get(key[i:i+3], set()) for i in range(len(key) - 2)]
+            toks = set.intersection(*grams) if grams else set()
+        else:
+            toks = self._postings.keys()
+        ids = set()
+        for tok in toks:
+            if key in tok:
+                ids.update(self._postings[tok])
+        return ids
 
     def review(self, n=20):
         return self.data["entries"][-n:]
 
 # ---------- Membrane (Server) ----------
+SENSITIVE_MARKERS = ["password","private_key","secret","api_key","token","ssh-rsa"]
+# all markers in one case-insensitive pass, stopping at the first hit
+_SENSITIVE_RE = re.compile("|".join(map(re.escape, SENSITIVE_MARKERS)), re.IGNORECASE)
+
 class Membrane:
     def __init__(self, brain_ref=None):
         self.brain = brain_ref
@@ -217,12 +495,10 @@ class Membrane:
         self.quarantine_dir = "membrane_quarantine"
         os.makedirs(self.quarantine_dir, exist_ok=True)
         self.encryption = EncryptionManager()
-        self._stop = threading.Event()
+        self._jobs = [SCHEDULER.every(60, self._decay_security, name="membrane-decay")]
         if self.config.get("auto_sync"):
-            t = threading.Thread(target=self._auto_sync_loop, daemon=True)
-            t.start()
-        t2 = threading.Thread(target=self._decay_loop, daemon=True)
-        t2.start()
+            self._jobs.append(SCHEDULER.every(self.config.get("sync_interval",300), self._auto_sync,
+                                              name="membrane-sync", jitter=5, delay=0))
         _log({"kind":"membrane_init","trusted_domains":self.config["trusted_domains"]})
 
     def _domain_allowed(self, url: str) -> bool:
@@ -269,11 +545,7 @@ class Membrane:
 
     def is_sensitive(self, data: bytes) -> bool:
         try:
-            txt = data.decode("utf-8", errors="ignore").lower()
-            for t in ["password","private_key","secret","api_key","token","ssh-rsa"]:
-                if t in txt:
-                    return True
-            return False
+            return bool(_SENSITIVE_RE.search(data.decode("utf-8", errors="ignore")))
         except Exception:
             return True
 
@@ -373,24 +645,23 @@ class Membrane:
             except Exception:
                 pass
 
-    def _decay_loop(self):
-        while True:
-            time.sleep(60)
-            if self.security_level > 1.0:
-                old = self.security_level
-                self.security_level = max(1.0, self.security_level - 0.1)
-                _log({"kind":"security_decay","old":old,"new":self.security_level})
+    def _decay_security(self):
+        if self.security_level > 1.0:
+            old = self.security_level
+            self.security_level = max(1.0, self.security_level - 0.1)
+            _log({"kind":"security_decay","old":old,"new":self.security_level})
 
-    def _auto_sync_loop(self):
-        while True:
-            try:
-                ep = self.config.get("cloud_endpoint","")
-                if ep and os.path.exists(getattr(self.brain,"memory_file","")):
-                    self.sync_brain_memory(ep)
-                time.sleep(self.config.get("sync_interval",300))
-            except Exception as e:
-                _log({"kind":"auto_sync_error","error":str(e)})
-                time.sleep(10)
+    def _auto_sync(self):
+        try:
+            ep = self.config.get("cloud_endpoint","")
+            if ep and os.path.exists(getattr(self.brain,"memory_file","")):
+                self.sync_brain_memory(ep)
+        except Exception as e:
+            _log({"kind":"auto_sync_error","error":str(e)})
+
+    def stop(self):
+        for job in self._jobs:
+            job.cancel()
 
     def sync_brain_memory(self, destination_url: Optional[str] = None) -> bool:
         mem_path = getattr(self.brain, "memory_file", None)
@@ -409,6 +680,17 @@ class Membrane:
         return False
 
 # ---------- Niblit Brain (higher-level) ----------
+QUICK_REPLIES = {
+    "hello":"Hey there!",
+    "hi":"Hi! I'm Niblit.",
+    "how are you":"I'm learning and improving.",
+    "what is your name":"I'm Niblit, your AI assistant.",
+    "bye":"Goodbye — be safe!",
+    "thank you":"You're welcome!",
+}
+# one pass over the message for all phrases; whole words only, so "this" is not "hi"
+_QUICK_REPLY_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, QUICK_REPLIES)) + r")\b")
+
 class NiblitBrain:
     def __init__(self):
         self.memory_file = os.path.join(MEMORY_DIR,"niblit_memory.json")
@@ -420,20 +702,17 @@ class NiblitBrain:
         _log({"kind":"brain_init"})
 
     def chat(self, message: str) -> str:
-        ml = message.lower().strip()
-        # quick built-in replies
-        for k in ["hello","hi","how are you","what is your name","bye","thank you"]:
-            if k in ml:
-                return {
-                    "hello":"Hey there!",
-                    "hi":"Hi! I'm Niblit.",
-                    "how are you":"I'm learning and improving.",
-                    "what is your name":"I'm Niblit, your AI assistant.",
-                    "bye":"Goodbye — be safe!",
-                    "thank you":"You're welcome!"
-                }[k]
+        ml = " ".join(message.lower().split())
+        # quick built-in replies: exact message first, then any phrase inside it
+        quick = QUICK_REPLIES.get(ml.rstrip("?!. "))
+        if quick is None:
+            m = _QUICK_REPLY_RE.search(ml)
+            quick = QUICK_REPLIES[m.group(0)] if m else None
+        if quick is not None:
+            return quick
         # training DB lookup
-        matches = self.training_db.find_matches(message)
+        # only verbatim or whole-query hits: a partial overlap is not an answer
+        matches = self.training_db.find_matches(message, cutoff=1.0, fuzzy=False)
         if matches:
             return matches[0][1]["response"]
         # fallback to bridge if available
@@ -463,20 +742,15 @@ class NiblitBrain:
         self.training_db.add_entry("[internal_security_event]", f"{event_key} level {new_level}", source="system")
 
     def _start_reflection_loop(self):
-        def loop():
-            while True:
-                try:
-                    # summarize last conversations and add as training example
-                    last = self.training_db.review(10)
-                    if len(last) >= 3:
-                        summary = " | ".join([f"{e['input']} -> {e['response']}" for e in last[-5:]])
-                        self.training_db.add_entry(f"reflection_{int(time.time())}", summary, source="reflection")
-                        _log({"kind":"self_reflect","summary":summary})
-                    time.sleep(600)
-                except Exception:
-                    time.sleep(60)
-        t = threading.Thread(target=loop, daemon=True)
-        t.start()
+        self._reflection_job = SCHEDULER.every(600, self._reflect, name="brain-reflect", jitter=10, delay=0)
+
+    def _reflect(self):
+        # summarize last conversations and add as training example
+        last = self.training_db.review(10)
+        if len(last) >= 3:
+            summary = " | ".join([f"{e['input']} -> {e['response']}" for e in last[-5:]])
+            self.training_db.add_entry(f"reflection_{int(time.time())}", summary, source="reflection")
+            _log({"kind":"self_reflect","summary":summary})
 
 # ---------- Bridge (GPT / external) ----------
 class Bridge:
@@ -495,7 +769,7 @@ class Bridge:
             url = "https://api.openai.com/v1/chat/completions"
             headers = {"Authorization": f"Bearer {key}", "Content-Type":"application/json"}
             payload = {"model":"gpt-4o-mini","messages":[{"role":"system","content":"You are Niblit AI."},{"role":"user","content":prompt}], "max_tokens": 512}
-            r = requests.post(url, headers=headers, json=payload, timeout=20)
+            r = http_session().post(url, headers=headers, json=payload, timeout=20)
             jr = r.json()
             text = jr.get("choices",[{}])[0].get("message",{}).get("content","[no reply]")
             self.session_memory.append({"user":prompt,"assistant":text})
@@ -561,7 +835,7 @@ class DraegtileNetwork:
         self.data = {}
         self.sync_interval = 3600
         self._load()
-        threading.Thread(target=self._auto_sync_loop, daemon=True).start()
+        self._sync_job = SCHEDULER.every(self.sync_interval, self._auto_sync, name="draegtile-sync", jitter=30, delay=0)
         _log({"kind":"draegtile_init"})
 
     def _load(self):
@@ -598,14 +872,11 @@ class DraegtileNetwork:
         for m in self.modules:
             self.sync_module(m)
 
-    def _auto_sync_loop(self):
-        while True:
-            try:
-                self.sync_all()
-                time.sleep(self.sync_interval)
-            except Exception as e:
-                _log({"kind":"draegtile_auto_sync_error","error":str(e)})
-                time.sleep(10)
+    def _auto_sync(self):
+        try:
+            self.sync_all()
+        except Exception as e:
+            _log({"kind":"draegtile_auto_sync_error","error":str(e)})
 
 # ---------- System Manager & Diagnostics ----------
 class SystemManager:
@@ -679,7 +950,8 @@ class DraegtileDashboardMobile:
         self.root.geometry("480x800")
         self.root.configure(bg="#121212")
         self._build()
-        threading.Thread(target=self._weather_loop, daemon=True).start()
+        # Tk's own timer: widgets may only be touched from the UI thread
+        self.root.after(0, self._refresh_weather)
 
     def _build(self):
         top = tk.Frame(self.root, bg="#1f1f1f")
@@ -757,17 +1029,16 @@ class DraegtileDashboardMobile:
             self.mem_view.insert(tk.END, json.dumps(e, indent=2) + "\n\n")
         self.mem_view.config(state=tk.DISABLED)
 
-    def _weather_loop(self):
-        while True:
-            try:
-                if hasattr(self.core.brain, "get_weather_status"):
-                    w = self.core.brain.get_weather_status()
-                else:
-                    w = "Weather unavailable"
-                self.status_label.config(text=w)
-            except Exception:
-                pass
-            time.sleep(20)
+    def _refresh_weather(self):
+        try:
+            if hasattr(self.core.brain, "get_weather_status"):
+                w = self.core.brain.get_weather_status()
+            else:
+                w = "Weather unavailable"
+            self.status_label.config(text=w)
+        except Exception:
+            pass
+        self.root.after(20000, self._refresh_weather)
 
 # ---------- Visualizer ----------
 class Visualizer:
@@ -860,32 +1131,27 @@ class NiblitMaster:
         self.trainer = Trainer()
         self.terminal = Terminal()
         self.bridge = self.brain.bridge
-        # background loops
-        threading.Thread(target=self._self_train_loop, daemon=True).start()
-        threading.Thread(target=self._alerter_loop, daemon=True).start()
+        # background jobs (all on the shared scheduler)
+        SCHEDULER.every(1800, self._self_train, name="self-train", jitter=30, delay=0)
+        SCHEDULER.every(60, self._alert, name="alerter", jitter=2, delay=0)
         self.gui_prefer = gui_prefer
         _log({"kind":"master_init","gui_prefer":self.gui_prefer})
 
-    def _self_train_loop(self):
-        while True:
-            try:
-                # pick random small improvements: add trivial training to keep memory fresh
-                self.brain.train("how are you", "I'm improving thanks to continuous learning.")
-                _log({"kind":"self_train_cycle","result":"ok"})
-                time.sleep(1800)
-            except Exception:
-                time.sleep(60)
+    def _self_train(self):
+        # pick random small improvements: add trivial training to keep memory fresh
+        self.brain.train("how are you", "I'm improving thanks to continuous learning.")
+        _log({"kind":"self_train_cycle","result":"ok"})
 
-    def _alerter_loop(self):
-        while True:
-            try:
-                if psutil:
-                    cpu = psutil.cpu_percent(interval=0.5)
-                    if cpu > 95:
-                        _log({"kind":"alerter","issue":"high_cpu","value":cpu})
-                time.sleep(60)
-            except Exception:
-                time.sleep(60)
+    def _alert(self):
+        if psutil:
+            cpu = psutil.cpu_percent(interval=0.5)
+            if cpu > 95:
+                _log({"kind":"alerter","issue":"high_cpu","value":cpu})
+
+    def shutdown(self):
+        """Stop every background job and write memory out."""
+        SCHEDULER.shutdown()
+        self.brain.training_db.close()
 
     def launch(self):
         # Try GUI first if available and desired
@@ -927,7 +1193,10 @@ class NiblitMaster:
 # ---------- Run ----------
 def main():
     gm = NiblitMaster(gui_prefer=True)
-    gm.launch()
+    try:
+        gm.launch()
+    finally:
+        gm.shutdown()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # niblit_sensors.py – fully updated, silent logging
 
 import threading, time, random, logging
+from modules.scheduler import default_scheduler
 
 log = logging.getLogger("NiblitSensors")
 
@@ -10,8 +11,8 @@ class NiblitSensors:
     def __init__(self):
         log.info("Initializing sensors...")
         self._lock = threading.Lock()
-        self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self._thread.start()
+        # automatic updates run on the shared scheduler
+        self._job = default_scheduler().every(30, self.update, name="sensors", jitter=1.0, delay=0)
 
     def read_sensors(self):
         """Simulate reading sensors."""
@@ -31,8 +32,6 @@ class NiblitSensors:
         except Exception as e:
             log.debug(f"[Sensor Update Error] {e}")
 
-    def _monitor_loop(self):
-        """Background automatic update loop."""
-        while True:
-            self.update()
-            time.sleep(30)
\ No newline at end of file
+    def close(self):
+        """Stop automatic updates."""
+        self._job.cancel()
\ No newline at end of file
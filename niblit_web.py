@@ -1,31 +1,33 @@
-from flask import Flask, request, jsonify
-import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 import time
 from datetime import datetime
 from niblit_core import NiblitCore
+from modules.sessions import new_session_id, clean_session_id
+from modules.memory_query import parse_query, etag, not_modified, iter_ndjson
+
+SESSION_COOKIE = "niblit_session"
 
 app = Flask(__name__)
 
 # Initialize Niblit Core (headless)
 niblit = NiblitCore()
 
-# Background health tracker
 uptime_start = time.time()
 
-def health_loop():
-    while True:
-        uptime_s = int(time.time() - uptime_start)
-        memory_entries = len(niblit.memory.data) if hasattr(niblit.memory, 'data') else 0
-        app.config['HEALTH'] = {
-            "uptime_s": uptime_s,
-            "memory_entries": memory_entries,
-            "network": getattr(niblit.network, 'status', 'offline'),
-            "persona_tone": getattr(niblit, 'persona_tone', 'balanced'),
-            "bridge": True
-        }
-        time.sleep(5)
+def current_health():
+    """Health computed on request; live updates go out on /status/stream."""
+    health = niblit.status_snapshot()
+    health["uptime_s"] = int(time.time() - uptime_start)
+    return health
 
-threading.Thread(target=health_loop, daemon=True).start()
+def session_id_for(data):
+    """Session id from the JSON body, the X-Session-Id header or the cookie."""
+    for value in ((data or {}).get("session_id"), request.headers.get("X-Session-Id"),
+                  request.cookies.get(SESSION_COOKIE)):
+        sid = clean_session_id(value)
+        if sid:
+            return sid, False
+    return new_session_id(), True
 
 # -------------------- ROUTES --------------------
 
@@ -33,43 +35,75 @@ threading.Thread(target=health_loop, daemon=True).start()
 def command():
     """
     Send a command to Niblit.
-    JSON payload: {"text": "<your command>"}
+    JSON payload: {"text": "<your command>", "session_id": "<optional>"}
+    Without a session id (body, X-Session-Id header or cookie) a new one is
+    issued and returned, and set as a cookie.
     """
     data = request.get_json()
     text = data.get("text", "")
     if not text:
         return jsonify({"error": "No command provided"}), 400
+    sid, is_new = session_id_for(data)
     try:
-        response = niblit.respond(text)
+        response = niblit.respond(text, session_id=sid)
     except Exception as e:
         response = f"Error: {str(e)}"
-    return jsonify({"response": response})
+    resp = jsonify({"response": response, "session_id": sid})
+    if is_new:
+        resp.set_cookie(SESSION_COOKIE, sid, httponly=True, samesite="Lax")
+    return resp
 
 @app.route("/status", methods=["GET"])
 def status():
     """Return core health and memory stats."""
-    health = app.config.get('HEALTH', {})
-    return jsonify(health)
+    return jsonify(current_health())
+
+@app.route("/status/stream", methods=["GET"])
+def status_stream():
+    """Server-sent events: the full status once, then only the fields that change."""
+    since = request.headers.get("Last-Event-ID", type=int)
+    return Response(stream_with_context(niblit.status_feed.sse(since)), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route("/memory", methods=["GET", "POST"])
 def memory():
-    """Get all memory entries or add new memory."""
+    """Get a page of memory entries or add new memory.
+
+    GET takes ?prefix= &since= &until= &cursor= &limit= (or &format=ndjson to
+    stream everything) and answers If-None-Match with 304 while nothing changed.
+    """
+    store = getattr(niblit, "memory", None)
+    if store is None:
+        return jsonify({"error": "memory module unavailable"}), 503
     if request.method == "GET":
-        mem = getattr(niblit.memory, 'data', {})
-        return jsonify(mem)
+        try:
+            filters, cursor, limit, stream = parse_query(request.args, default_limit=100)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        current = etag(store)
+        headers = {"ETag": current, "Cache-Control": "no-cache"}
+        if not_modified(request.headers.get("If-None-Match"), current):
+            return Response(status=304, headers=headers)
+        if stream:
+            return Response(stream_with_context(iter_ndjson(store, filters)),
+                            mimetype="application/x-ndjson", headers=headers)
+        entries, next_cursor = store.query_facts(cursor=cursor, limit=limit, **filters)
+        resp = jsonify({"entries": entries, "next_cursor": next_cursor})
+        resp.headers.update(headers)
+        return resp
     elif request.method == "POST":
         data = request.get_json()
         key = data.get("key")
         value = data.get("value")
         if not key or value is None:
             return jsonify({"error": "Provide both key and value"}), 400
-        niblit.memory.set(key, value)
+        store.set(key, value)
         return jsonify({"message": f"Remembered {key}"}), 200
 
 @app.route("/health", methods=["GET"])
 def health():
     """Return uptime and basic system health."""
-    return jsonify(app.config.get('HEALTH', {}))
+    return jsonify(current_health())
 
 # -------------------- RUN SERVER --------------------
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 # server.py
 import os, logging, time, json
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from modules.niblit_bridge import Bridge
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
@@ -17,6 +17,14 @@ def status():
         "time": time.time()
     })
 
+def _safe_stream(chunks):
+    try:
+        for c in chunks:
+            yield c
+    except Exception as e:
+        log.exception("chat stream error")
+        yield f"\n[error: {e}]"
+
 @app.route("/chat", methods=["POST"])
 def chat():
     payload = request.json or {}
@@ -24,6 +32,14 @@ def chat():
     prefer = payload.get("prefer","openai")
     if not text:
         return jsonify({"error":"no text provided"}), 400
+    if payload.get("stream"):
+        try:
+            chunks = BRIDGE.send_to_llm(text, prefer=prefer, stream=True)
+        except Exception as e:
+            log.exception("chat error")
+            return jsonify({"ok": False, "error": str(e)}), 500
+        # chunked plain-text body, flushed token by token
+        return Response(stream_with_context(_safe_stream(chunks)), mimetype="text/plain")
     try:
         reply = BRIDGE.send_to_llm(text, prefer=prefer)
         # ensure string
@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.llm_adapter import LLMAdapter
+from modules.llm_registry import LLMBackendRegistry
+from modules.sessions import SessionState
+from niblit_core_refactor import _route_llm
+
+
+class FailingClient:
+    model = "failing"
+
+    def is_available(self):
+        return True
+
+    def query_chat(self, messages, max_tokens=300):
+        raise ConnectionError("provider down")
+
+
+class UnconfiguredClient:
+    model = "none"
+
+    def is_available(self):
+        return False
+
+
+class FakeCore:
+    def __init__(self, client=FailingClient):
+        self.client = client
+        self.built = 0
+        self.llm_backends = LLMBackendRegistry(max_failures=3, cooldown=0)
+        self.llm_backends.register("default", self._make_llm)
+
+    def _make_llm(self):
+        self.built += 1
+        llm = LLMAdapter(cache=None)
+        llm.openai = llm.hf = self.client()
+        return llm
+
+    def llm_backend(self, name="default"):
+        return self.llm_backends.get(name)
+
+
+def test_failing_provider_rebuilds_backend():
+    core = FakeCore()
+    session = SessionState("t")
+    for _ in range(3):
+        reply = _route_llm(core, session, "hello", "")
+        assert "hello" in reply  # echo fallback still answers the user
+    assert core.llm_backends.status()["default"] == {"loaded": False, "failures": 3}
+    _route_llm(core, session, "hello", "")
+    assert core.built == 2
+
+
+def test_unconfigured_provider_is_not_a_failure():
+    core = FakeCore(UnconfiguredClient)
+    session = SessionState("t")
+    for _ in range(5):
+        assert _route_llm(core, session, "hello", "").startswith("(No LLM configured)")
+    assert core.llm_backends.status()["default"] == {"loaded": True, "failures": 0}
+    assert core.built == 1
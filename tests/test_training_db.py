@@ -0,0 +1,88 @@
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="module")
+def v5(tmp_path_factory):
+    # the module creates its log and memory dirs in the cwd on import
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("v5"))
+    try:
+        yield importlib.import_module("niblit_pro_v5_main")
+    finally:
+        os.chdir(cwd)
+
+
+def open_db(v5, path):
+    return v5.TrainingDB(str(path), journal=True, compact_interval=3600, compact_threshold=10**6)
+
+
+def inputs(db):
+    return [e["input"] for e in db.data["entries"]]
+
+
+def test_replay_after_failed_compactions(v5, tmp_path):
+    path = tmp_path / "mem.json"
+    db = open_db(v5, path)
+
+    def fail(data):
+        raise OSError("disk full")
+
+    db._write_snapshot = fail
+    db.add_entry("first", "1")
+    assert db.compact() is False
+    db.add_entry("second", "2")
+    assert db.compact() is False  # must not overwrite the leftover .compacting
+    db._compact_job.cancel()
+
+    reopened = open_db(v5, path)
+    assert inputs(reopened) == ["first", "second"]
+    assert not os.path.exists(reopened.journal_path + ".compacting")
+    reopened.close()
+
+
+def test_replay_after_crash_mid_compaction(v5, tmp_path):
+    path = tmp_path / "mem.json"
+    db = open_db(v5, path)
+    db.add_entry("a", "1")
+    db.add_entry("b", "2")
+    db._compact_job.cancel()
+    db._journal_fh.close()
+    # crash after rotating the journal, then one more write torn mid-line
+    os.replace(db.journal_path, db.journal_path + ".compacting")
+    with open(db.journal_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": 3, "entry": {"input": "c", "response": "3"}}) + "\n")
+        f.write('{"seq": 4, "entry": {"inp')
+
+    reopened = open_db(v5, path)
+    assert inputs(reopened) == ["a", "b", "c"]
+    reopened.add_entry("d", "4")
+    reopened.close()
+    again = open_db(v5, path)
+    assert inputs(again) == ["a", "b", "c", "d"]
+    again.close()
+
+
+def test_trim_keeps_index_consistent(v5, tmp_path):
+    path = tmp_path / "mem.json"
+    db = open_db(v5, path)
+    for i in range(5001):
+        db.add_entry(f"item{i} shared", str(i))
+    assert len(db.data["entries"]) == 4000
+    assert db._base == 1001
+    assert db.find_matches("item0", fuzzy=False) == []
+    assert [e["response"] for _, e in db.find_matches("item1001", fuzzy=False)] == ["1001"]
+    assert min(db._postings["shared"]) == db._base
+    db.close()
+
+    reopened = open_db(v5, path)
+    assert len(reopened.data["entries"]) == 4000
+    assert [e["response"] for _, e in reopened.find_matches("item5000", fuzzy=False)] == ["5000"]
+    reopened.close()
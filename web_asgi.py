@@ -0,0 +1,182 @@
+# web_asgi.py
+"""ASGI version of niblit_web.py for the headless NiblitCore.
+
+Same routes (/command, /status, /memory, /health) plus /chat and /ping as on
+Niblit/asgi.py. Blocking core calls run on a BoundedExecutor (503 when it is
+full); the core is started in the startup hook and shut down cleanly in the
+shutdown hook. Health is computed per request instead of by a polling thread,
+and dashboards get changes pushed on /status/stream (server-sent events).
+
+    python web_asgi.py              # NIBLIT_HOST / PORT / NIBLIT_MAX_CONNECTIONS
+    uvicorn web_asgi:app --host 0.0.0.0 --port 5000
+
+Keep one worker process: sessions and memory live in the core.
+"""
+import os
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import uvicorn
+
+from modules.worker_pool import BoundedExecutor, Overloaded
+from modules.sessions import new_session_id, clean_session_id
+from modules.memory_query import parse_query, etag, not_modified, iter_ndjson
+
+SESSION_COOKIE = "niblit_session"
+
+app = FastAPI(title="Niblit Web", version="1.0")
+pool = BoundedExecutor(name="niblit-web")
+niblit = None  # NiblitCore, created on startup
+uptime_start = time.time()
+
+def _memory_store():
+    # None before startup, or when the core runs without niblit_memory
+    return getattr(niblit, "memory", None)
+
+def _unavailable():
+    return JSONResponse({"error": "memory module unavailable"}, status_code=503)
+
+def _busy():
+    return JSONResponse({"error": "busy, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+
+async def _json(request):
+    try:
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def session_id_for(request, data):
+    """Session id from the JSON body, the X-Session-Id header or the cookie."""
+    for value in (data.get("session_id"), request.headers.get("x-session-id"),
+                  request.cookies.get(SESSION_COOKIE)):
+        sid = clean_session_id(value)
+        if sid:
+            return sid, False
+    return new_session_id(), True
+
+@app.on_event("startup")
+async def _startup():
+    global niblit
+    from niblit_core import NiblitCore
+    niblit = await pool.run(NiblitCore)
+
+@app.on_event("shutdown")
+async def _shutdown():
+    if niblit is not None:
+        try:
+            await pool.run(niblit.shutdown)
+        except Exception:
+            pass
+    pool.shutdown()
+
+async def _respond(request, key):
+    data = await _json(request)
+    text = str(data.get("text", "")).strip()
+    if not text:
+        return JSONResponse({"error": "No command provided"}, status_code=400)
+    sid, is_new = session_id_for(request, data)
+    try:
+        response = await pool.run(niblit.respond, text, sid)
+    except Overloaded:
+        return _busy()
+    except Exception as e:
+        response = f"Error: {str(e)}"
+    resp = JSONResponse({key: response, "session_id": sid})
+    if is_new:
+        resp.set_cookie(SESSION_COOKIE, sid, httponly=True, samesite="lax")
+    return resp
+
+@app.post("/command")
+async def command(request: Request):
+    """JSON payload: {"text": "<your command>", "session_id": "<optional>"}"""
+    return await _respond(request, "response")
+
+@app.post("/chat")
+async def chat(request: Request):
+    return await _respond(request, "reply")
+
+def _health():
+    # only reads in-memory counters, so it runs inline: a pool full of chat
+    # turns must not make the health check answer 503
+    health = niblit.status_snapshot() if niblit is not None else {"status": "starting"}
+    health["uptime_s"] = int(time.time() - uptime_start)
+    health["workers"] = pool.stats()
+    return health
+
+@app.get("/status")
+async def status():
+    return _health()
+
+@app.get("/health")
+async def health():
+    return _health()
+
+@app.get("/status/stream")
+async def status_stream(request: Request):
+    """Server-sent events: the full status once, then only the fields that change."""
+    if niblit is None:
+        return JSONResponse({"error": "starting, retry shortly"}, status_code=503, headers={"Retry-After": "1"})
+    feed = niblit.status_feed
+    if feed.version == 0:
+        try:
+            await pool.run(feed.refresh)  # first sample off the event loop
+        except Overloaded:
+            return _busy()
+    since = request.headers.get("last-event-id")
+    return StreamingResponse(feed.sse_async(int(since) if since and since.isdigit() else None),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/ping")
+async def ping():
+    return {"status": "ok" if niblit is not None else "starting"}
+
+@app.get("/memory")
+async def memory(request: Request):
+    # ?prefix= &since= &until= &cursor= &limit= &format=ndjson; 304 while nothing changed
+    try:
+        filters, cursor, limit, stream = parse_query(request.query_params, default_limit=100)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    store = _memory_store()
+    if store is None:
+        return _unavailable()
+    current = etag(store)
+    headers = {"ETag": current, "Cache-Control": "no-cache"}
+    if not_modified(request.headers.get("if-none-match"), current):
+        return Response(status_code=304, headers=headers)
+    if stream:
+        try:
+            return StreamingResponse(pool.stream(iter_ndjson, store, filters), media_type="application/x-ndjson",
+                                     headers=headers)
+        except Overloaded:
+            return _busy()
+    try:
+        entries, next_cursor = await pool.run(store.query_facts, cursor=cursor, limit=limit, **filters)
+    except Overloaded:
+        return _busy()
+    return JSONResponse({"entries": entries, "next_cursor": next_cursor}, headers=headers)
+
+@app.post("/memory")
+async def remember(request: Request):
+    data = await _json(request)
+    key, value = data.get("key"), data.get("value")
+    if not key or value is None:
+        return JSONResponse({"error": "Provide both key and value"}, status_code=400)
+    store = _memory_store()
+    if store is None:
+        return _unavailable()
+    try:
+        await pool.run(store.set, key, value)
+    except Overloaded:
+        return _busy()
+    return {"message": f"Remembered {key}"}
+
+def main():
+    uvicorn.run(app, host=os.environ.get("NIBLIT_HOST", "0.0.0.0"), port=int(os.environ.get("PORT", 5000)),
+                proxy_headers=True, forwarded_allow_ips="*", backlog=2048, timeout_keep_alive=15,
+                limit_concurrency=int(os.environ.get("NIBLIT_MAX_CONNECTIONS", "1000")))
+
+if __name__ == "__main__":
+    main()